@@ -11,6 +11,7 @@ from squishy.blueprints.ui import ui_bp
 from squishy.blueprints.admin import admin_bp
 from squishy.blueprints.onboarding import onboarding_bp
 from squishy import scanner
+from squishy.transcoder import init_transcoder
 
 # Initialize SocketIO globally
 socketio = SocketIO()
@@ -64,6 +65,9 @@ def create_app(test_config=None):
     
     # Import socket events after socketio initialization to avoid circular imports
     from squishy import socket_events  # noqa
+
+    # Restore saved jobs and start dispatching queued ones
+    init_transcoder()
     
     # Add a before_request handler to check if this is the first run
     @app.before_request
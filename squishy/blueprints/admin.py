@@ -18,7 +18,8 @@ from squishy.config import load_config, save_config
 from squishy.scanner import scan_jellyfin_async, scan_plex_async
 from squishy.transcoder import (
     detect_hw_accel,
-    process_job_queue,
+    get_capabilities,
+    wake_scheduler,
     get_running_job_count,
     get_pending_jobs,
 )
@@ -56,6 +57,15 @@ audio_codecs = [
     {"value": "copy", "label": "Copy (passthrough)"},
 ]
 
+encoder_presets = [
+    {"value": "", "label": "Default (medium)"},
+    {"value": "veryfast", "label": "Very fast"},
+    {"value": "faster", "label": "Faster"},
+    {"value": "fast", "label": "Fast"},
+    {"value": "medium", "label": "Medium"},
+    {"value": "slow", "label": "Slow"},
+]
+
 audio_bitrates = [
     {"value": "64k", "label": "64 kbps (low)"},
     {"value": "96k", "label": "96 kbps (medium)"},
@@ -172,6 +182,8 @@ def add_preset():
             crf = None
             bitrate = request.form["bitrate"]
 
+        encoder_preset = request.form.get("encoder_preset")
+
         audio_codec = request.form["audio_codec"]
         audio_bitrate = request.form["audio_bitrate"]
 
@@ -196,6 +208,10 @@ def add_preset():
         elif bitrate:
             preset["bitrate"] = bitrate
 
+        # Only store a speed preset if one was chosen
+        if encoder_preset:
+            preset["encoder_preset"] = encoder_preset
+
         # Add to config and save
         config = load_config()
         config.presets[name] = preset
@@ -211,6 +227,7 @@ def add_preset():
         codecs=codecs,
         containers=containers,
         scales=scales,
+        encoder_presets=encoder_presets,
         audio_codecs=audio_codecs,
         audio_bitrates=audio_bitrates,
     )
@@ -240,6 +257,8 @@ def edit_preset(name):
             crf = None
             bitrate = request.form["bitrate"]
 
+        encoder_preset = request.form.get("encoder_preset")
+
         audio_codec = request.form["audio_codec"]
         audio_bitrate = request.form["audio_bitrate"]
 
@@ -264,6 +283,10 @@ def edit_preset(name):
         elif bitrate:
             preset["bitrate"] = bitrate
 
+        # Only store a speed preset if one was chosen
+        if encoder_preset:
+            preset["encoder_preset"] = encoder_preset
+
         # Update config
         config.presets[name] = preset
         save_config(config)
@@ -282,6 +305,7 @@ def edit_preset(name):
         codecs=codecs,
         containers=containers,
         scales=scales,
+        encoder_presets=encoder_presets,
         audio_codecs=audio_codecs,
         audio_bitrates=audio_bitrates,
     )
@@ -743,7 +767,7 @@ def update_paths_and_hw():
     else:
         current_app.logger.debug("No path mappings configured")
 
-    # Save config first so process_job_queue uses the updated max_concurrent_jobs
+    # Save config first so the scheduler uses the updated max_concurrent_jobs
     save_config(config)
 
     # Check job queue if concurrent jobs limit changed
@@ -759,8 +783,8 @@ def update_paths_and_hw():
                 f"Concurrent job limit increased from {old_max_concurrent_jobs} to {new_max_concurrent_jobs}. Processing job queue with {len(pending_jobs)} pending jobs."
             )
 
-            # Process the job queue immediately
-            process_job_queue()
+            # Let the scheduler start queued jobs in the new slots
+            wake_scheduler()
 
             if pending_jobs:
                 flash(
@@ -791,7 +815,8 @@ def detect_hw_accel_route():
     config = load_config()
     ffmpeg_path = config.ffmpeg_path
 
-    # Run detection
+    # Run detection, refreshing the cached capabilities since the user asked
+    detected_capabilities = get_capabilities(ffmpeg_path, refresh=True)
     hw_accel_info = detect_hw_accel(ffmpeg_path)
 
     # Automatically set the recommended hardware acceleration method
@@ -802,9 +827,6 @@ def detect_hw_accel_route():
         hw_accel_info["auto_configured"] = True
 
     # Include the raw capabilities JSON from effeffmpeg detection
-    from squishy.effeffmpeg import detect_capabilities
-
-    detected_capabilities = detect_capabilities(quiet=True)
     hw_accel_info["capabilities_json"] = detected_capabilities
 
     # If we already have capabilities saved in config, include them as well
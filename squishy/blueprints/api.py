@@ -123,6 +123,7 @@ def list_presets():
                     "container": preset.get("container", ".mkv"),
                     "crf": preset.get("crf"),
                     "bitrate": preset.get("bitrate"),
+                    "encoder_preset": preset.get("encoder_preset"),
                     "audio_codec": preset.get("audio_codec", "aac"),
                     "audio_bitrate": preset.get("audio_bitrate", "128k"),
                     "force_software": preset.get("force_software", False),
@@ -176,7 +177,7 @@ def transcode():
 @api_bp.route("/jobs", methods=["GET"])
 def list_jobs():
     """List all transcoding jobs."""
-    from squishy.transcoder import JOBS
+    from squishy.transcoder import get_jobs
 
     return jsonify(
         {
@@ -193,11 +194,9 @@ def list_jobs():
                     if hasattr(job, "current_time")
                     else None,
                     "duration": job.duration if hasattr(job, "duration") else None,
-                    "ffmpeg_logs": job.ffmpeg_logs[-30:]
-                    if job.ffmpeg_logs
-                    else [],  # Include last 30 log lines
+                    "ffmpeg_logs": job.recent_logs(30),  # Include last 30 log lines
                 }
-                for job in JOBS.values()
+                for job in get_jobs()
             ]
         }
     )
@@ -221,9 +220,7 @@ def get_job_status(job_id):
             "error_message": job.error_message,
             "current_time": job.current_time if hasattr(job, "current_time") else None,
             "duration": job.duration if hasattr(job, "duration") else None,
-            "ffmpeg_logs": job.ffmpeg_logs[-30:]
-            if job.ffmpeg_logs
-            else [],  # Include last 30 log lines
+            "ffmpeg_logs": job.recent_logs(30),  # Include last 30 log lines
         }
     )
 
@@ -264,10 +261,10 @@ def get_job_logs(job_id):
 
     if limit and limit.isdigit() and int(limit) > 0:
         # Get the last N log entries
-        log_entries = job.ffmpeg_logs[-int(limit) :]
+        log_entries = job.recent_logs(int(limit))
     else:
         # Get all log entries
-        log_entries = job.ffmpeg_logs
+        log_entries = job.recent_logs()
 
     return jsonify({"ffmpeg_command": job.ffmpeg_command, "ffmpeg_logs": log_entries})
 
@@ -1,6 +1,8 @@
 """User interface blueprint."""
 
 import os
+from typing import Optional
+
 from flask import (
     Blueprint,
     render_template,
@@ -14,26 +16,25 @@ from flask import (
 from squishy.config import load_config
 from squishy.scanner import get_media, get_show
 from squishy.transcoder import (
-    JOBS,
     create_job,
+    get_jobs,
     start_transcode,
     apply_output_path_mapping,
     remove_job as remove_transcode_job,
     cancel_job as cancel_transcode_job,
 )
 from squishy.completed import get_completed_transcodes, delete_transcode
+from squishy.media_info import format_file_size
 
 ui_bp = Blueprint("ui", __name__)
 
 
-# Helper function to format file size
-def format_file_size(bytes_size):
-    if bytes_size < 1024 * 1024:  # Less than 1 MB
-        return f"{round(bytes_size / 1024, 2)} KB"
-    elif bytes_size < 1024 * 1024 * 1024:  # Less than 1 GB
-        return f"{round(bytes_size / (1024 * 1024), 2)} MB"
-    else:  # GB or larger
-        return f"{round(bytes_size / (1024 * 1024 * 1024), 2)} GB"
+def _safe_size(path: str) -> Optional[int]:
+    """Get a file's size with a single stat, or None if it can't be read."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
 
 
 @ui_bp.route("/")
@@ -148,7 +149,7 @@ def jobs():
     completed_jobs = []
     failed_jobs = []
 
-    for job in JOBS.values():
+    for job in get_jobs():
         media_item = get_media(job.media_id)
         if media_item:
             # Get file size in a human-readable format
@@ -157,12 +158,12 @@ def jobs():
                 file_size = format_file_size(file_size_bytes)
 
                 # If job is completed and has output path, show both sizes and compression percentage
-                if (
-                    job.status == "completed"
-                    and job.output_path
-                    and os.path.exists(job.output_path)
-                ):
-                    output_size_bytes = os.path.getsize(job.output_path)
+                output_size_bytes = (
+                    _safe_size(job.output_path)
+                    if job.status == "completed" and job.output_path
+                    else None
+                )
+                if output_size_bytes is not None:
                     output_size = format_file_size(output_size_bytes)
 
                     # Calculate compression percentage
@@ -268,13 +269,20 @@ def completed():
 
     # Add original file size and compression details
     for transcode in completed_transcodes:
-        if "original_path" in transcode and os.path.exists(transcode["original_path"]):
-            # Get original file size
-            original_size_bytes = os.path.getsize(transcode["original_path"])
+        # One stat per file; a missing file just falls back to the sidecar size
+        original_size_bytes = (
+            _safe_size(transcode["original_path"])
+            if "original_path" in transcode
+            else None
+        )
+        output_size_bytes = (
+            _safe_size(transcode["file_path"])
+            if original_size_bytes is not None
+            else None
+        )
+        if output_size_bytes is not None:
+            # Get original and transcoded file sizes
             original_size = format_file_size(original_size_bytes)
-
-            # Get transcoded file size
-            output_size_bytes = os.path.getsize(transcode["file_path"])
             output_size = format_file_size(output_size_bytes)
 
             # Calculate compression percentage
@@ -1,10 +1,12 @@
 """Configuration module for Squishy."""
 
+import copy
 import json
 import os
 import logging
+import threading
 from dataclasses import dataclass
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 
 
 @dataclass
@@ -28,6 +30,8 @@ class Config:
     enabled_libraries: Dict[str, bool] = None  # Dictionary of library_id -> enabled status
     log_level: str = "INFO"  # Application log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     secret_key: Optional[str] = None  # Flask session secret key
+    encoder_nice: Optional[int] = None  # Niceness increment applied to FFmpeg processes
+    reserved_cpus: int = 0  # Number of CPUs kept free of FFmpeg for the web server
     
     def __post_init__(self):
         """Ensure dictionaries are initialized."""
@@ -39,6 +43,12 @@ class Config:
             self.enabled_libraries = {}
 
 
+# Parsed configurations keyed by path, with the (mtime, size) of the file
+# they were read from
+_CONFIG_CACHE: Dict[str, Tuple[Tuple[int, int], Config]] = {}
+_CONFIG_LOCK = threading.Lock()
+
+
 def is_first_run(config_path: str = None) -> bool:
     """
     Determine if this is the first run of the application.
@@ -73,11 +83,43 @@ def is_first_run(config_path: str = None) -> bool:
         return True
 
 
+def _config_file_key(config_path: str) -> Optional[Tuple[int, int]]:
+    """Get the (mtime, size) of a config file, or None if it doesn't exist."""
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 def load_config(config_path: str = None) -> Config:
-    """Load configuration from a JSON file."""
+    """Load configuration from a JSON file.
+
+    The parsed configuration is cached until the file changes, and each
+    caller gets its own copy so it can be modified freely.
+    """
     if config_path is None:
         config_path = os.environ.get("CONFIG_PATH", "./config/config.json")
-        
+
+    file_key = _config_file_key(config_path)
+    with _CONFIG_LOCK:
+        cached = _CONFIG_CACHE.get(config_path)
+
+    if file_key is not None and cached is not None and cached[0] == file_key:
+        config = cached[1]
+    else:
+        config = _read_config(config_path)
+        # A missing file isn't cached, so the defaults are re-checked until
+        # the file is created
+        if file_key is not None:
+            with _CONFIG_LOCK:
+                _CONFIG_CACHE[config_path] = (file_key, config)
+
+    return copy.deepcopy(config)
+
+
+def _read_config(config_path: str) -> Config:
+    """Read and parse a configuration file, falling back to defaults."""
     # Check if the config directory exists, create it if not
     config_dir = os.path.dirname(config_path)
     if not os.path.exists(config_dir):
@@ -193,6 +235,8 @@ def load_config(config_path: str = None) -> Config:
         enabled_libraries=enabled_libraries,
         log_level=config_data.get("log_level", "INFO"),
         secret_key=config_data.get("secret_key"),
+        encoder_nice=config_data.get("encoder_nice"),
+        reserved_cpus=config_data.get("reserved_cpus", 0),
     )
 
 
@@ -223,6 +267,8 @@ def save_config(config: Config, config_path: str = None) -> None:
         "enabled_libraries": config.enabled_libraries,
         "log_level": config.log_level,
         "secret_key": config.secret_key,
+        "encoder_nice": config.encoder_nice,
+        "reserved_cpus": config.reserved_cpus,
     }
 
     # Only include one source configuration
@@ -234,4 +280,8 @@ def save_config(config: Config, config_path: str = None) -> None:
         config_data["plex_token"] = config.plex_token
 
     with open(config_path, "w") as f:
-        json.dump(config_data, f, indent=2)
\ No newline at end of file
+        json.dump(config_data, f, indent=2)
+
+    # Don't rely on the mtime alone; it may not change on coarse filesystems
+    with _CONFIG_LOCK:
+        _CONFIG_CACHE.pop(config_path, None)
\ No newline at end of file
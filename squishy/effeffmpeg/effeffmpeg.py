@@ -12,12 +12,15 @@ import argparse
 import json
 import os
 import re
+import signal
 import subprocess
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union, Any, Callable, BinaryIO
+from typing import Dict, List, Optional, Set, Tuple, Union, Any, Callable
 
 def run_command(command: str) -> Tuple[bool, str]:
     """
@@ -36,6 +39,30 @@ def run_command(command: str) -> Tuple[bool, str]:
     except subprocess.CalledProcessError as e:
         return False, e.stderr.decode()
 
+# Output dimensions for each supported scale
+_RESOLUTIONS = {
+    "360p": (640, 360),
+    "480p": (854, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "2160p": (3840, 2160)
+}
+
+# Codecs each container supports, plus its default (video, audio) codecs
+_CONTAINER_CODECS = {
+    ".mp4": {"video": ["h264", "hevc"], "audio": ["aac", "copy"], "default": ("h264", "aac")},
+    ".mkv": {"video": ["h264", "hevc", "vp9"], "audio": ["aac", "flac", "opus", "libopus", "copy"], "default": ("hevc", "aac")},
+    ".webm": {"video": ["vp9", "av1"], "audio": ["opus", "libopus"], "default": ("vp9", "libopus")},
+    ".mov": {"video": ["h264", "hevc"], "audio": ["aac", "copy"], "default": ("h264", "aac")}
+}
+
+# Speed/efficiency presets understood by the x264 and x265 software encoders
+ENCODER_PRESETS = (
+    "ultrafast", "superfast", "veryfast", "faster", "fast",
+    "medium", "slow", "slower", "veryslow"
+)
+_ENCODER_PRESET_ENCODERS = ("libx264", "libx265")
+
 def parse_resolution(res: str) -> Tuple[int, int]:
     """
     Convert a resolution string to width and height dimensions.
@@ -46,14 +73,7 @@ def parse_resolution(res: str) -> Tuple[int, int]:
     Returns:
         A tuple of (width, height) in pixels
     """
-    presets = {
-        "360p": (640, 360),
-        "480p": (854, 480),
-        "720p": (1280, 720),
-        "1080p": (1920, 1080),
-        "2160p": (3840, 2160)
-    }
-    return presets.get(res, (1280, 720))
+    return _RESOLUTIONS.get(res, (1280, 720))
 
 def validate_quality_options(encoder, crf, bitrate, audio_codec, audio_bitrate, flac_compression, context="CLI flag", quiet=False):
     """
@@ -122,12 +142,7 @@ def validate_codecs(container, video_codec, audio_codec, context="CLI flag", qui
     Raises:
         ValueError: If any validation fails
     """
-    matrix = {
-        ".mp4": {"video": ["h264", "hevc"], "audio": ["aac", "copy"], "default": ("h264", "aac")},
-        ".mkv": {"video": ["h264", "hevc", "vp9"], "audio": ["aac", "flac", "opus", "libopus", "copy"], "default": ("hevc", "aac")},
-        ".webm": {"video": ["vp9", "av1"], "audio": ["opus", "libopus"], "default": ("vp9", "libopus")},
-        ".mov": {"video": ["h264", "hevc"], "audio": ["aac", "copy"], "default": ("h264", "aac")}
-    }
+    matrix = _CONTAINER_CODECS
 
     errors = []
 
@@ -151,16 +166,10 @@ def validate_codecs(container, video_codec, audio_codec, context="CLI flag", qui
 
 def infer_defaults_from_extension(output_file):
     ext = Path(output_file).suffix.lower()
-    defaults = {
-        ".mp4": ("h264", "aac"),
-        ".mkv": ("hevc", "aac"),
-        ".webm": ("vp9", "libopus"),
-        ".mov": ("h264", "aac")
-    }
-    if ext not in defaults:
-        print(f"[✗] Unsupported container extension '{ext}'. Must be one of: {', '.join(defaults)}")
+    if ext not in _CONTAINER_CODECS:
+        print(f"[✗] Unsupported container extension '{ext}'. Must be one of: {', '.join(_CONTAINER_CODECS)}")
         sys.exit(1)
-    return ext, *defaults[ext]
+    return ext, *_CONTAINER_CODECS[ext]["default"]
 
 def validate_presets_data(presets_data, quiet=False):
     """
@@ -278,6 +287,11 @@ def validate_config(
     if scale is not None and scale not in ["360p", "480p", "720p", "1080p", "2160p"]:
         errors.append(f"Invalid scale '{scale}'. Valid values: 360p, 480p, 720p, 1080p, 2160p")
 
+    # Validate encoder speed preset
+    encoder_preset = config.get('encoder_preset')
+    if encoder_preset is not None and encoder_preset not in ENCODER_PRESETS:
+        errors.append(f"Invalid encoder preset '{encoder_preset}'. Valid values: {', '.join(ENCODER_PRESETS)}")
+
     # Validate quality options
     try:
         validate_quality_options(
@@ -328,6 +342,61 @@ def validate_preset_config(preset_name, config, quiet=False):
         check_container=True
     )
 
+def list_video_encoders(ffmpeg_path: str = "ffmpeg") -> Optional[Set[str]]:
+    """
+    Get the names of the video encoders compiled into an FFmpeg build.
+
+    Args:
+        ffmpeg_path: Path to the ffmpeg executable
+
+    Returns:
+        A set of encoder names, or None if the encoder list couldn't be read
+    """
+    try:
+        result = subprocess.run([ffmpeg_path, "-hide_banner", "-encoders"],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+
+    # Encoder lines follow a " ------" separator and look like
+    # " V....D h264_vaapi           H.264/AVC (VAAPI) (codec h264)"
+    # Work on the raw bytes and decode only the names, not the descriptions
+    listing = result.stdout.partition(b"------")[2]
+    return {
+        fields[1].decode('ascii', errors='replace')
+        for fields in (line.split(None, 2) for line in listing.splitlines())
+        if len(fields) >= 2 and fields[0].startswith(b"V")
+    }
+
+def list_render_devices() -> List[str]:
+    """
+    Get the DRM render nodes that VAAPI can use.
+
+    Returns:
+        Sorted paths of the /dev/dri/renderD* nodes, or an empty list if there are none
+    """
+    try:
+        with os.scandir("/dev/dri") as entries:
+            return sorted(entry.path for entry in entries if entry.name.startswith("renderD"))
+    except OSError:
+        return []
+
+# Software encoder for each codec, used without hardware or as the fallback
+_SOFTWARE_ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "vp9": "libvpx-vp9",
+    "av1": "libaom-av1"
+}
+
+# VAAPI hardware encoder for each codec that detection tests
+_VAAPI_ENCODERS = {
+    "h264": "h264_vaapi",
+    "hevc": "hevc_vaapi"
+}
+
 def detect_capabilities(ffmpeg_path: str = "ffmpeg", quiet: bool = False) -> Dict[str, Any]:
     """
     Detect hardware acceleration capabilities on the system.
@@ -351,49 +420,66 @@ def detect_capabilities(ffmpeg_path: str = "ffmpeg", quiet: bool = False) -> Dic
         "hwaccel": None,
         "device": "/dev/dri/renderD128",
         "encoders": {},
-        "fallback_encoders": {
-            "h264": "libx264",
-            "hevc": "libx265",
-            "vp9": "libvpx-vp9",
-            "av1": "libaom-av1"
-        }
+        "fallback_encoders": dict(_SOFTWARE_ENCODERS)
     }
 
-    device = capabilities["device"]
-
-    if not os.path.exists(device):
+    # Test the first render node (renderD128 on single-GPU systems)
+    devices = list_render_devices()
+    if not devices:
         if not quiet:
-            print(f"[✗] VAAPI device {device} does not exist.")
+            print("[✗] No VAAPI render device found in /dev/dri.")
         return capabilities
+    device = capabilities["device"] = devices[0]
 
-    # Use the provided ffmpeg path
+    # Use the provided ffmpeg path; the test encode is the same for every encoder
     tests = {
-        "h264_vaapi": (
+        encoder: (
             f"{ffmpeg_path} -hide_banner -init_hw_device vaapi=va:{device} -filter_hw_device va "
             f"-f lavfi -i testsrc=duration=1:size=1280x720:rate=30 -vf 'format=nv12,hwupload' "
-            f"-c:v h264_vaapi -t 1 -f null -"
-        ),
-        "hevc_vaapi": (
-            f"{ffmpeg_path} -hide_banner -init_hw_device vaapi=va:{device} -filter_hw_device va "
-            f"-f lavfi -i testsrc=duration=1:size=1280x720:rate=30 -vf 'format=nv12,hwupload' "
-            f"-c:v hevc_vaapi -t 1 -f null -"
+            f"-c:v {encoder} -t 1 -f null -"
         )
+        for encoder in _VAAPI_ENCODERS.values()
     }
+    codecs = {encoder: codec for codec, encoder in _VAAPI_ENCODERS.items()}
 
-    for encoder, cmd in tests.items():
-        if not quiet:
+    # Only run test encodes for encoders this FFmpeg build actually has
+    available = list_video_encoders(ffmpeg_path)
+    if available is not None:
+        for encoder in [name for name in tests if name not in available]:
+            if not quiet:
+                print(f"[✗] {encoder} not available in this FFmpeg build")
+            del tests[encoder]
+
+    if not quiet:
+        for encoder in tests:
             print(f"Testing {encoder}...")
-        success, output = run_command(cmd)
+
+    # The test encodes are independent, so run them at the same time
+    results = {}
+    if tests:
+        with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+            results = dict(zip(tests, pool.map(run_command, tests.values())))
+
+    for encoder, (success, output) in results.items():
         if success:
             if not quiet:
                 print(f"[✓] {encoder} supported")
             capabilities["hwaccel"] = "vaapi"
-            capabilities["encoders"][encoder.replace("_vaapi", "")] = encoder
+            capabilities["encoders"][codecs[encoder]] = encoder
         elif not quiet:
             print(f"[✗] {encoder} not supported:\n{output.strip()}\n")
 
     return capabilities
 
+# Compiled byte patterns used to scan FFmpeg output a chunk at a time
+# A key/value line from -progress output (e.g., out_time=00:01:23.450000);
+# also how progress lines are told apart from log output
+_PROGRESS_KV_RE = re.compile(rb'^[ \t]*(\w+)=[ \t]*(.*?)\s*$')
+# Duration from the input banner (e.g., Duration: 00:05:23.45)
+_DURATION_RE = re.compile(rb'Duration:\s*(\d+):(\d+):(\d+)(?:\.(\d+))?')
+# Time progress from regular stats output (e.g., time=00:01:23.45)
+_TIME_RE = re.compile(rb'time=\s*(\d+):(\d+):(\d+)(?:\.(\d+))?')
+
 class TranscodeProcess:
     """
     Class to manage an FFmpeg transcoding process with live output access.
@@ -404,17 +490,18 @@ class TranscodeProcess:
     Attributes:
         command (List[str]): The FFmpeg command used to start the process
         process (subprocess.Popen): The running subprocess
-        stdout_thread (threading.Thread): Thread that reads from stdout
-        stderr_thread (threading.Thread): Thread that reads from stderr
-        stdout_buffer (List[str]): Lines captured from stdout
-        stderr_buffer (List[str]): Lines captured from stderr
+        reader_thread (threading.Thread): Thread that reads FFmpeg's combined output
+        stdout_buffer (List[str]): Progress (key=value) lines captured from the output
+        stderr_buffer (List[str]): Log lines captured from the output
         progress_callback (Callable): Function to call with progress updates
         started (bool): Whether the process has been started
         finished (bool): Whether the process has finished
         returncode (Optional[int]): The process return code, or None if still running
     """
 
-    def __init__(self, command: List[str], progress_callback: Optional[Callable[[str, Optional[float]], None]] = None, debug: bool = False):
+    def __init__(self, command: List[str], progress_callback: Optional[Callable[[str, Optional[float]], None]] = None, debug: bool = False,
+                 nice: Optional[int] = None, cpu_affinity: Optional[Set[int]] = None,
+                 duration: Optional[float] = None):
         """
         Initialize a new TranscodeProcess.
 
@@ -422,11 +509,15 @@ class TranscodeProcess:
             command: List of strings forming the FFmpeg command
             progress_callback: Optional function to call with each line of ffmpeg output
             debug: Enable debug output for progress tracking
+            nice: Optional niceness increment for the FFmpeg process (POSIX only)
+            cpu_affinity: Optional set of CPUs the FFmpeg process may run on (Linux only)
+            duration: Input duration in seconds, if already known; skips probing the input on start
         """
         self.command = command
+        self.nice = nice
+        self.cpu_affinity = cpu_affinity
         self.process = None
-        self.stdout_thread = None
-        self.stderr_thread = None
+        self.reader_thread = None
         self.stdout_buffer = []
         self.stderr_buffer = []
         self.progress_callback = progress_callback
@@ -434,177 +525,190 @@ class TranscodeProcess:
         self.finished = False
         self.returncode = None
         self._start_time = None
-        # Improved regex patterns for more robust detection
-        # Pattern for frame number (e.g., frame=  123)
-        self._progress_pattern = re.compile(r'frame=\s*(\d+)')
-        # Pattern for duration (e.g., Duration: 00:05:23.45)
-        self._duration_pattern = re.compile(r'Duration:\s*(\d+):(\d+):(\d+)(?:\.(\d+))?')
-        # Pattern for time progress (e.g., time=00:01:23.45)
-        self._time_pattern = re.compile(r'time=\s*(\d+):(\d+):(\d+)(?:\.(\d+))?')
-        # Pattern for speed (e.g., speed=2.3x)
-        self._speed_pattern = re.compile(r'speed=\s*([\d.]+)x')
         self._total_frames = None
-        self._duration_seconds = None
+        self._duration_seconds = duration
         self.debug = debug
 
-    def _read_output(self, stream: BinaryIO, buffer: List[str], is_stderr: bool = False):
-        """Read output from a stream and update the appropriate buffer."""
-        line_count = 0
-        progress_data = {}  # Store the latest progress values
-        
+    def _read_output(self):
+        """Read FFmpeg's combined output and split it into progress and log lines."""
+        state = {"line_count": 0, "progress_data": {}}
+        pending = bytearray()
+        fd = self.process.stdout.fileno()
+
         while True:
-            line = stream.readline()
-            if not line:
+            # Read whatever is available in one syscall rather than a line at a time
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                # Flush a trailing partial line, if any
+                if pending:
+                    self._process_output(bytes(pending), state)
                 break
 
+            pending += chunk
+            newline = pending.rfind(b"\n")
+            if newline == -1:
+                continue
+
+            # Only complete lines are processed; keep the remainder for the next read
+            block = bytes(pending[:newline])
+            del pending[:newline + 1]
+            self._process_output(block, state)
+
+    def _process_output(self, block: bytes, state: Dict[str, Any]):
+        """Update the buffers and report progress from a block of complete output lines."""
+        progress_data = state["progress_data"]  # Store the latest progress values
+        lines = []
+        out_time = None
+        finished = False
+        time_match = time_line = None  # Last time= position in the log lines
+
+        # stderr is merged into stdout, so sort -progress key=value pairs from
+        # log lines with the same pattern that parses them. -progress output
+        # is formatted as key=value pairs with each pair on a new line; only
+        # the latest position in the block is reported.
+        for raw_line in block.splitlines():
+            line_str = raw_line.decode('utf-8', errors='replace').rstrip()
+            lines.append(line_str)
+            match = _PROGRESS_KV_RE.match(raw_line)
+            if match:
+                self.stdout_buffer.append(line_str)
+                key = match.group(1).decode('ascii')
+                value = match.group(2).decode('utf-8', errors='replace')
+                progress_data[key] = value
+                if key == 'out_time':
+                    out_time = value
+                elif key == 'progress' and value == 'end':
+                    finished = True
+            else:
+                self.stderr_buffer.append(line_str)
+            # Stats lines ("frame=... time=...") also look like key=value
+            # pairs, so the fallback position is taken from any line
+            if b'time=' in raw_line:
+                for match in _TIME_RE.finditer(raw_line):
+                    time_match, time_line = match, line_str
+
+        # Print every line for debugging if requested
+        if self.debug:
+            for line_str in lines:
+                state["line_count"] += 1
+                line_count = state["line_count"]
+                if line_count % 20 == 0:
+                    print(f"[DEBUG] Line {line_count}: {line_str[:80]}")
+
+        # First check for the duration pattern in FFmpeg output
+        if self._duration_seconds is None:
+            duration_match = _DURATION_RE.search(block)
+            if duration_match:
+                h, m, s, ms = (duration_match.group(1), duration_match.group(2),
+                              duration_match.group(3), duration_match.group(4) or b'0')
+                try:
+                    h, m, s = float(h), float(m), float(s)
+                    ms = float(b'0.' + ms) if ms else 0.0
+                    self._duration_seconds = h * 3600 + m * 60 + s + ms
+                    if self.debug:
+                        print(f"[DEBUG] Found duration: {h:.0f}h {m:.0f}m {s:.2f}s = {self._duration_seconds:.1f}s")
+                except ValueError as e:
+                    if self.debug:
+                        print(f"[DEBUG] Error parsing duration: {e}")
+
+        if progress_data and self.debug:
+            for key in ['out_time', 'progress', 'speed', 'total_size']:
+                if key in progress_data:
+                    print(f"[DEBUG] Progress info: {key}={progress_data[key]}")
+
+        if out_time is not None and self._duration_seconds and self.progress_callback:
+            # out_time is in format HH:MM:SS.MS
             try:
-                line_str = line.decode('utf-8', errors='replace').rstrip()
-            except UnicodeDecodeError:
-                line_str = line.decode('latin-1', errors='replace').rstrip()
-
-            buffer.append(line_str)
-            line_count += 1
-
-            # Print every line for debugging if requested
-            if self.debug and line_count % 20 == 0:
-                stream_type = "STDERR" if is_stderr else "STDOUT"
-                print(f"[DEBUG] {stream_type} Line {line_count}: {line_str[:80]}")
-
-            # First check for the duration pattern in FFmpeg output
-            if self._duration_seconds is None:
-                duration_match = self._duration_pattern.search(line_str)
-                if duration_match:
-                    h, m, s, ms = (duration_match.group(1), duration_match.group(2), 
-                                  duration_match.group(3), duration_match.group(4) or '0')
-                    try:
-                        h, m, s = float(h), float(m), float(s)
-                        ms = float('0.' + ms) if ms else 0.0
-                        self._duration_seconds = h * 3600 + m * 60 + s + ms
-                        if self.debug:
-                            print(f"[DEBUG] Found duration: {h:.0f}h {m:.0f}m {s:.2f}s = {self._duration_seconds:.1f}s")
-                    except ValueError as e:
-                        if self.debug:
-                            print(f"[DEBUG] Error parsing duration: {e}")
+                time_parts = out_time.split(':')
+                if len(time_parts) == 3:
+                    h, m, s_parts = time_parts
+                    s = float(s_parts)
+                    h, m = float(h), float(m)
+
+                    current_seconds = h * 3600 + m * 60 + s
+                    progress_percent = min(current_seconds / self._duration_seconds, 1.0)
+
+                    # Create a status message with useful information
+                    speed = progress_data.get('speed', 'N/A')
+                    frame = progress_data.get('frame', 'N/A')
+                    fps = progress_data.get('fps', 'N/A')
+                    total_size = progress_data.get('total_size', 'N/A')
+
+                    # Calculate ETA if speed is available
+                    eta_str = "ETA: unknown"
+                    if speed != 'N/A' and speed.endswith('x'):
+                        try:
+                            speed_val = float(speed.rstrip('x'))
+                            remaining = (self._duration_seconds - current_seconds) / max(speed_val, 0.1)
+                            minutes, seconds = divmod(int(remaining), 60)
+                            hours, minutes = divmod(minutes, 60)
+                            eta_str = f"ETA: {hours:02d}:{minutes:02d}:{seconds:02d}"
+                        except (ValueError, ZeroDivisionError):
+                            pass
+
+                    status = (f"Time: {int(h):02d}:{int(m):02d}:{s:.2f}/{int(self._duration_seconds/3600):02d}:"
+                              f"{int((self._duration_seconds%3600)/60):02d}:{self._duration_seconds%60:.2f}, "
+                              f"Frame: {frame}, FPS: {fps}, Speed: {speed}, {eta_str}")
+
+                    # Call progress callback with calculated percentage
+                    if self.debug:
+                        print(f"[DEBUG] Progress: {progress_percent:.1%} - {status}")
 
-            # Process the progress information from FFmpeg's -progress output
-            # This is formatted as key=value pairs with each pair on a new line
-            if '=' in line_str:
+                    self.progress_callback(status, progress_percent)
+            except (ValueError, IndexError) as e:
+                if self.debug:
+                    print(f"[DEBUG] Error parsing out_time: {out_time} - {e}")
+
+        if finished and self.progress_callback:
+            # End of the file, set progress to 100%
+            status = "Transcoding completed!"
+            self.progress_callback(status, 1.0)
+            if self.debug:
+                print(f"[DEBUG] End of transcoding reached")
+
+        # As a fallback, try to extract progress from regular FFmpeg output patterns
+        # This handles the case where -progress isn't working as expected
+        elif out_time is None and self._duration_seconds and self.progress_callback:
+            # For time pattern in normal ffmpeg output (fallback)
+            if time_match:
                 try:
-                    key, value = line_str.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    # Store this key-value pair
-                    progress_data[key] = value
-                    
-                    if self.debug and key in ['out_time', 'progress', 'speed', 'total_size']:
-                        print(f"[DEBUG] Progress info: {key}={value}")
-                    
-                    # If we get a "progress" marker, this is the end of a progress chunk
-                    # This is a good time to calculate and report progress
-                    if key == 'progress' and value == 'end':
-                        # End of the file, set progress to 100%
-                        if self.progress_callback:
-                            status = "Transcoding completed!"
-                            self.progress_callback(status, 1.0)
-                            if self.debug:
-                                print(f"[DEBUG] End of transcoding reached")
-                    
-                    # Check if we've accumulated enough information to calculate progress
-                    elif key == 'out_time' and self._duration_seconds and self.progress_callback:
-                        # out_time is in format HH:MM:SS.MS
-                        try:
-                            time_parts = value.split(':')
-                            if len(time_parts) == 3:
-                                h, m, s_parts = time_parts
-                                s = float(s_parts)
-                                h, m = float(h), float(m)
-                                
-                                current_seconds = h * 3600 + m * 60 + s
-                                progress_percent = min(current_seconds / self._duration_seconds, 1.0)
-                                
-                                # Create a status message with useful information
-                                speed = progress_data.get('speed', 'N/A')
-                                frame = progress_data.get('frame', 'N/A')
-                                fps = progress_data.get('fps', 'N/A')
-                                total_size = progress_data.get('total_size', 'N/A')
-                                
-                                # Calculate ETA if speed is available
-                                eta_str = "ETA: unknown"
-                                if speed != 'N/A' and speed.endswith('x'):
-                                    try:
-                                        speed_val = float(speed.rstrip('x'))
-                                        remaining = (self._duration_seconds - current_seconds) / max(speed_val, 0.1)
-                                        minutes, seconds = divmod(int(remaining), 60)
-                                        hours, minutes = divmod(minutes, 60)
-                                        eta_str = f"ETA: {hours:02d}:{minutes:02d}:{seconds:02d}"
-                                    except (ValueError, ZeroDivisionError):
-                                        pass
-                                
-                                status = (f"Time: {int(h):02d}:{int(m):02d}:{s:.2f}/{int(self._duration_seconds/3600):02d}:"
-                                          f"{int((self._duration_seconds%3600)/60):02d}:{self._duration_seconds%60:.2f}, "
-                                          f"Frame: {frame}, FPS: {fps}, Speed: {speed}, {eta_str}")
-                                
-                                # Call progress callback with calculated percentage
-                                if self.debug:
-                                    print(f"[DEBUG] Progress: {progress_percent:.1%} - {status}")
-                                
-                                self.progress_callback(status, progress_percent)
-                        except (ValueError, IndexError) as e:
-                            if self.debug:
-                                print(f"[DEBUG] Error parsing out_time: {value} - {e}")
-                
-                except Exception as e:
+                    h, m, s, ms = (time_match.group(1), time_match.group(2),
+                                  time_match.group(3), time_match.group(4) or b'0')
+                    h, m, s = float(h), float(m), float(s)
+                    ms = float(b'0.' + ms) if ms else 0.0
+                    current_seconds = h * 3600 + m * 60 + s + ms
+                    progress_percent = min(current_seconds / self._duration_seconds, 1.0)
+
                     if self.debug:
-                        print(f"[DEBUG] Error processing progress line: {line_str} - {e}")
-            
-            # As a fallback, try to extract progress from regular FFmpeg output patterns
-            # This handles the case where -progress isn't working as expected
-            elif self._duration_seconds and self.progress_callback and not is_stderr:
-                # For time pattern in normal ffmpeg output (fallback)
-                time_match = self._time_pattern.search(line_str)
-                frame_match = self._progress_pattern.search(line_str)
-                
-                if time_match:
-                    try:
-                        h, m, s, ms = (time_match.group(1), time_match.group(2), 
-                                      time_match.group(3), time_match.group(4) or '0')
-                        h, m, s = float(h), float(m), float(s)
-                        ms = float('0.' + ms) if ms else 0.0
-                        current_seconds = h * 3600 + m * 60 + s + ms
-                        progress_percent = min(current_seconds / self._duration_seconds, 1.0)
-                        
-                        if self.debug:
-                            print(f"[DEBUG] Fallback time found: {h:02.0f}:{m:02.0f}:{s:.2f} - Progress: {progress_percent:.1%}")
-                        
-                        self.progress_callback(line_str, progress_percent)
-                    except (ValueError, IndexError) as e:
-                        if self.debug:
-                            print(f"[DEBUG] Error parsing fallback time: {e}")
+                        print(f"[DEBUG] Fallback time found: {h:02.0f}:{m:02.0f}:{s:.2f} - Progress: {progress_percent:.1%}")
+
+                    self.progress_callback(time_line, progress_percent)
+                except (ValueError, IndexError) as e:
+                    if self.debug:
+                        print(f"[DEBUG] Error parsing fallback time: {e}")
 
-    def _extract_duration_from_output(self, stderr_output):
+    def _extract_duration_from_output(self, stderr_output: bytes):
         """
         Extract the duration from the initial stderr output of FFmpeg.
 
         FFmpeg usually outputs the duration information at the beginning when it analyzes the input file.
         This method tries to find and extract that information.
         """
-        # Scan the output for duration information
-        for line in stderr_output.split('\n'):
-            duration_match = self._duration_pattern.search(line)
-            if duration_match:
-                h, m, s, ms = (duration_match.group(1), duration_match.group(2), 
-                              duration_match.group(3), duration_match.group(4) or '0')
-                try:
-                    h, m, s = float(h), float(m), float(s)
-                    ms = float('0.' + ms) if ms else 0.0
-                    self._duration_seconds = h * 3600 + m * 60 + s + ms
-                    if self.debug:
-                        print(f"[DEBUG] Found duration: {h:.0f}h {m:.0f}m {s:.2f}s = {self._duration_seconds:.2f}s")
-                    return True
-                except (ValueError, IndexError) as e:
-                    if self.debug:
-                        print(f"[DEBUG] Error parsing duration: {e}")
+        # Scan the raw output for duration information
+        duration_match = _DURATION_RE.search(stderr_output)
+        if duration_match:
+            h, m, s, ms = (duration_match.group(1), duration_match.group(2),
+                          duration_match.group(3), duration_match.group(4) or b'0')
+            try:
+                h, m, s = float(h), float(m), float(s)
+                ms = float(b'0.' + ms) if ms else 0.0
+                self._duration_seconds = h * 3600 + m * 60 + s + ms
+                if self.debug:
+                    print(f"[DEBUG] Found duration: {h:.0f}h {m:.0f}m {s:.2f}s = {self._duration_seconds:.2f}s")
+                return True
+            except (ValueError, IndexError) as e:
+                if self.debug:
+                    print(f"[DEBUG] Error parsing duration: {e}")
         
         if self.debug:
             print("[DEBUG] Could not find duration in FFmpeg output")
@@ -652,8 +756,7 @@ class TranscodeProcess:
                             print("[DEBUG] Falling back to ffmpeg for duration detection")
                         info_cmd = ["ffmpeg", "-i", input_file]
                         result = subprocess.run(info_cmd, capture_output=True, text=False)
-                        stderr_output = result.stderr.decode('utf-8', errors='replace')
-                        self._extract_duration_from_output(stderr_output)
+                        self._extract_duration_from_output(result.stderr)
                 
                 except Exception as e:
                     if self.debug:
@@ -663,33 +766,54 @@ class TranscodeProcess:
             print(f"[DEBUG] Final duration detection: {self._duration_seconds:.2f}s")
 
         # Start the actual process
+        # On POSIX, put FFmpeg in its own session/process group so a cancel can
+        # signal the whole group (FFmpeg plus any helpers) without orphaning it
         self.process = subprocess.Popen(
             self.command,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            bufsize=-1,  # Use the default buffer size
-            universal_newlines=False  # Binary mode for better handling of unusual output
+            stderr=subprocess.STDOUT,  # Merge logs into the progress pipe so one fd is read
+            bufsize=0,  # Unbuffered; the reader pulls large chunks straight from the pipe fds
+            universal_newlines=False,  # Binary mode for better handling of unusual output
+            close_fds=True,
+            pass_fds=(),
+            start_new_session=(os.name == "posix")
         )
 
         self.started = True
+        self._apply_scheduling()
 
-        # Start threads to read output
-        self.stdout_thread = threading.Thread(
-            target=self._read_output,
-            args=(self.process.stdout, self.stdout_buffer, False),
-            daemon=True
-        )
-        self.stderr_thread = threading.Thread(
+        # Start a thread to read FFmpeg's combined output
+        self.reader_thread = threading.Thread(
             target=self._read_output,
-            args=(self.process.stderr, self.stderr_buffer, True),
             daemon=True
         )
-
-        self.stdout_thread.start()
-        self.stderr_thread.start()
+        self.reader_thread.start()
 
         return self
 
+    def _apply_scheduling(self):
+        """
+        Apply the requested niceness and CPU affinity to the FFmpeg process.
+
+        This is done from the parent right after spawning instead of with a
+        preexec_fn, which isn't safe to use from a threaded program. FFmpeg
+        starts its encoder threads after probing the input, so they inherit
+        the settings.
+        """
+        pid = self.process.pid
+        if self.nice and hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, pid, os.getpriority(os.PRIO_PROCESS, pid) + self.nice)
+            except OSError as e:
+                if self.debug:
+                    print(f"[DEBUG] Could not set FFmpeg niceness: {e}")
+        if self.cpu_affinity and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(pid, self.cpu_affinity)
+            except OSError as e:
+                if self.debug:
+                    print(f"[DEBUG] Could not set FFmpeg CPU affinity: {e}")
+
     def wait(self, timeout: Optional[float] = None) -> int:
         """
         Wait for the process to complete.
@@ -715,8 +839,7 @@ class TranscodeProcess:
             self.finished = True
 
             # Make sure we've captured all output
-            self.stdout_thread.join()
-            self.stderr_thread.join()
+            self.reader_thread.join()
 
             return self.returncode
         except subprocess.TimeoutExpired as e:
@@ -725,13 +848,45 @@ class TranscodeProcess:
             # and we're just checking if it's done yet
             return None
 
+    def _signal(self, sig: int):
+        """Send a signal to the FFmpeg process group (or just the process on non-POSIX)."""
+        if os.name == "posix":
+            try:
+                # The process was started in its own session, so its PID is the PGID
+                os.killpg(self.process.pid, sig)
+                return
+            except (ProcessLookupError, PermissionError):
+                pass
+        self.process.send_signal(sig)
+
+    def send_signal(self, sig: int) -> bool:
+        """Signal the FFmpeg process group if FFmpeg is still running.
+
+        Returns:
+            True if the signal was sent
+        """
+        # Only signal while FFmpeg is still unreaped; once it has been
+        # waited for, its PID/PGID may belong to another process
+        if not self.process or self.process.poll() is not None:
+            return False
+        self._signal(sig)
+        return True
+
     def terminate(self):
-        """Terminate the FFmpeg process."""
+        """Terminate the FFmpeg process and any helpers in its process group."""
         if self.process and not self.finished:
-            self.process.terminate()
-            self.wait(timeout=5)  # Give it a chance to terminate gracefully
-            if not self.finished:
-                self.process.kill()  # Force kill if it didn't terminate
+            if self.send_signal(signal.SIGTERM):
+                try:
+                    self.process.wait(timeout=5)  # Give it a chance to terminate gracefully
+                except subprocess.TimeoutExpired:
+                    if os.name == "posix":
+                        # Kill the whole group, including helpers that would
+                        # keep the device and output pipe open
+                        self._signal(signal.SIGKILL)
+                    else:
+                        self.process.kill()
+
+            self.wait()
 
     def get_stdout(self) -> str:
         """Get the captured stdout output."""
@@ -768,6 +923,113 @@ class TranscodeProcess:
                 if self.debug:
                     print(f"[DEBUG] Error in final progress callback: {e}")
 
+# FFmpeg can output machine-readable progress information
+# Use -progress pipe:1 to write progress info to stdout (pipe:2 would be stderr)
+# Don't use -stats which outputs human-readable progress to stderr
+_PROGRESS_ARGS = ("-progress", "pipe:1", "-nostats")
+
+@lru_cache(maxsize=None)
+def _hw_input_args(device: str) -> Tuple[str, ...]:
+    """
+    Build the VAAPI hardware setup arguments that precede the input file.
+
+    Args:
+        device: Path to the VAAPI render device
+
+    Returns:
+        A tuple of FFmpeg arguments
+    """
+    return (
+        "-hwaccel", "vaapi",
+        "-hwaccel_device", device,
+        "-init_hw_device", f"vaapi=va:{device}",
+        "-filter_hw_device", "va",
+    )
+
+@lru_cache(maxsize=None)
+def _video_args(
+    encoder: str,
+    using_hardware: bool,
+    scale: Optional[str],
+    crf: Optional[int],
+    bitrate: Optional[str],
+    encoder_preset: Optional[str] = None
+) -> Tuple[str, ...]:
+    """
+    Build the video filter and encoder arguments for an encoding profile.
+
+    Presets are applied to many files with identical settings, so the
+    fragment is computed once per profile and reused.
+
+    Args:
+        encoder: Video encoder to use (hardware or software)
+        using_hardware: Whether the encoder is a VAAPI hardware encoder
+        scale: Target resolution (360p, 480p, 720p, 1080p, 2160p)
+        crf: Constant Rate Factor (software encoding only)
+        bitrate: Target video bitrate (e.g. "2M")
+        encoder_preset: x264/x265 speed preset (software encoding only)
+
+    Returns:
+        A tuple of FFmpeg arguments
+    """
+    args = []
+    if using_hardware:
+        if scale:
+            width, height = parse_resolution(scale)
+            args += ["-vf", f"format=nv12,hwupload,scale_vaapi=w={width}:h={height}"]
+        else:
+            args += ["-vf", "format=nv12,hwupload"]
+        args += ["-c:v", encoder]
+        if bitrate:
+            args += ["-b:v", bitrate]
+    else:
+        if scale:
+            width, height = parse_resolution(scale)
+            args += ["-vf", f"scale={width}:{height}"]
+        args += ["-c:v", encoder]
+        if encoder_preset and encoder in _ENCODER_PRESET_ENCODERS:
+            args += ["-preset", encoder_preset]
+        if crf is not None:
+            args += ["-crf", str(crf)]
+        elif bitrate:
+            args += ["-b:v", bitrate]
+        else:
+            args += ["-crf", "28"]
+    return tuple(args)
+
+@lru_cache(maxsize=None)
+def _audio_args(
+    audio_codec: str,
+    audio_bitrate: Optional[str],
+    flac_compression: Optional[int]
+) -> Tuple[str, ...]:
+    """
+    Build the audio encoder arguments for an encoding profile.
+
+    Args:
+        audio_codec: Audio codec to use (copy, aac, flac, opus, libopus)
+        audio_bitrate: Target audio bitrate (e.g. "128k")
+        flac_compression: FLAC compression level (0-8)
+
+    Returns:
+        A tuple of FFmpeg arguments
+    """
+    if audio_codec == "copy":
+        return ("-c:a", "copy")
+
+    args = ["-c:a", audio_codec]
+
+    # Handle audio channel mapping issues
+    if audio_codec in ["opus", "libopus"]:
+        # Add channel layout conversion for opus to ensure compatibility with multichannel audio
+        args += ["-ac", "2"]  # Convert to stereo (2 channels) for maximum compatibility
+
+    if audio_codec in ["aac", "opus", "libopus"] and audio_bitrate:
+        args += ["-b:a", audio_bitrate]
+    if audio_codec == "flac" and flac_compression is not None:
+        args += ["-compression_level", str(flac_compression)]
+    return tuple(args)
+
 def generate_ffmpeg_command(
     input_file: Union[str, Path],
     output_file: Union[str, Path],
@@ -783,7 +1045,9 @@ def generate_ffmpeg_command(
     flac_compression: Optional[int] = None,
     overwrite: bool = False,
     quiet: bool = False,
-    progress: bool = False
+    progress: bool = False,
+    threads: Optional[int] = None,
+    encoder_preset: Optional[str] = None
 ) -> List[str]:
     """
     Generate an FFmpeg command for transcoding video with hardware acceleration awareness.
@@ -806,6 +1070,9 @@ def generate_ffmpeg_command(
         flac_compression: FLAC compression level (0-8)
         overwrite: Add -y flag to force overwriting output file
         quiet: Suppress informational output
+        progress: Add options for machine-readable progress reporting
+        threads: Maximum number of threads the encoder may use (FFmpeg picks if None)
+        encoder_preset: x264/x265 speed preset, e.g. "veryfast" (software encoding only)
 
     Returns:
         A list of strings forming the FFmpeg command
@@ -825,7 +1092,8 @@ def generate_ffmpeg_command(
         'crf': crf,
         'bitrate': bitrate,
         'audio_bitrate': audio_bitrate,
-        'flac_compression': flac_compression
+        'flac_compression': flac_compression,
+        'encoder_preset': encoder_preset
     }
 
     # Validate configuration without checking for container (CLI doesn't require it)
@@ -863,69 +1131,24 @@ def generate_ffmpeg_command(
     if using_hardware and crf is not None and not quiet:
         print("[!] CRF is only allowed with software encoding. CRF will be ignored when hardware encoding is used.")
 
-    filters = []
-    command = ["ffmpeg"]
-
-    # Add -y flag to force overwrite without prompting if requested
-    if overwrite:
-        command.append("-y")
-
-    if using_hardware:
-        if not quiet:
-            print(f"[✓] Using hardware acceleration with encoder '{encoder}'")
-        command += [
-            "-hwaccel", "vaapi",
-            "-hwaccel_device", device,
-            "-init_hw_device", f"vaapi=va:{device}",
-            "-filter_hw_device", "va",
-            "-i", str(input_file)
-        ]
-        if scale:
-            width, height = parse_resolution(scale)
-            filters.append(f"format=nv12,hwupload,scale_vaapi=w={width}:h={height}")
-        else:
-            filters.append("format=nv12,hwupload")
-        command += ["-vf", ",".join(filters), "-c:v", encoder]
-        if bitrate:
-            command += ["-b:v", bitrate]
-    else:
-        command += ["-i", str(input_file)]
-        if scale:
-            width, height = parse_resolution(scale)
-            filters.append(f"scale={width}:{height}")
-            command += ["-vf", ",".join(filters)]
-        command += ["-c:v", fallback]
-        if crf is not None:
-            command += ["-crf", str(crf)]
-        elif bitrate:
-            command += ["-b:v", bitrate]
-        else:
-            command += ["-crf", "28"]
-
-    if audio_codec == "copy":
-        command += ["-c:a", "copy"]
-    else:
-        command += ["-c:a", audio_codec]
-
-        # Handle audio channel mapping issues
-        if audio_codec in ["opus", "libopus"]:
-            # Add channel layout conversion for opus to ensure compatibility with multichannel audio
-            command += ["-ac", "2"]  # Convert to stereo (2 channels) for maximum compatibility
-
-        if audio_codec in ["aac", "opus", "libopus"] and audio_bitrate:
-            command += ["-b:a", audio_bitrate]
-        if audio_codec == "flac" and flac_compression is not None:
-            command += ["-compression_level", str(flac_compression)]
-    
-    # Add progress reporting option if requested
-    # FFmpeg can output machine-readable progress information
-    if progress:
-        # Use -progress pipe:1 to write progress info to stdout
-        # pipe:1 refers to stdout, pipe:2 would be stderr
-        # Don't use -stats which outputs human-readable progress to stderr
-        command += ["-progress", "pipe:1", "-nostats"]
-    
-    command.append(str(output_file))
+    if using_hardware and not quiet:
+        print(f"[✓] Using hardware acceleration with encoder '{encoder}'")
+
+    # Assemble the command in one pass from the cached per-profile fragments
+    command = [
+        "ffmpeg",
+        # Add -y flag to force overwrite without prompting if requested
+        *(("-y",) if overwrite else ()),
+        *(_hw_input_args(device) if using_hardware else ()),
+        "-i", str(input_file),
+        *_video_args(encoder if using_hardware else fallback, bool(using_hardware), scale, crf, bitrate,
+                     encoder_preset),
+        *(("-threads", str(threads)) if threads else ()),
+        *_audio_args(audio_codec, audio_bitrate, flac_compression),
+        # Add progress reporting option if requested
+        *(_PROGRESS_ARGS if progress else ()),
+        str(output_file),
+    ]
     return command
 
 def transcode(
@@ -941,6 +1164,7 @@ def transcode(
     audio_bitrate: Optional[str] = None,
     flac_compression: Optional[int] = None,
     capabilities_file: Optional[str] = None,
+    capabilities: Optional[Dict[str, Any]] = None,
     dry_run: bool = False,
     overwrite: bool = False,
     quiet: bool = False,
@@ -948,7 +1172,12 @@ def transcode(
     progress_callback: Optional[Callable[[str, Optional[float]], None]] = None,
     preset_name: Optional[str] = None,
     presets_data: Optional[Dict[str, Dict[str, Any]]] = None,
-    presets_file: Optional[str] = None
+    presets_file: Optional[str] = None,
+    nice: Optional[int] = None,
+    cpu_affinity: Optional[Set[int]] = None,
+    threads: Optional[int] = None,
+    duration: Optional[float] = None,
+    encoder_preset: Optional[str] = None
 ) -> Union[List[str], subprocess.CompletedProcess, TranscodeProcess]:
     """
     Transcode a video file using FFmpeg with optimal hardware acceleration settings.
@@ -970,6 +1199,7 @@ def transcode(
         audio_bitrate: Target audio bitrate (e.g. "128k")
         flac_compression: FLAC compression level (0-8)
         capabilities_file: Path to a JSON file with hardware capabilities (if None, detection will be performed)
+        capabilities: Already detected hardware capabilities (takes precedence over capabilities_file)
         dry_run: If True, returns the command without executing it
         overwrite: Add -y flag to force overwriting output file
         quiet: Suppress informational output
@@ -978,6 +1208,11 @@ def transcode(
         preset_name: Name of the preset to use from either presets_data or presets_file
         presets_data: Dictionary containing preset configurations (overrides presets_file)
         presets_file: Path to a JSON file containing preset configurations
+        nice: Niceness increment for the FFmpeg process when using progress tracking or non_blocking
+        cpu_affinity: CPUs the FFmpeg process may run on when using progress tracking or non_blocking
+        threads: Maximum number of threads the encoder may use (FFmpeg picks if None)
+        duration: Input duration in seconds, if already known, used for progress instead of probing the input
+        encoder_preset: x264/x265 speed preset, e.g. "veryfast" (software encoding only)
 
     Returns:
         If dry_run is True, returns the FFmpeg command as a list of strings.
@@ -1038,10 +1273,10 @@ def transcode(
     flac_compression_val = flac_compression if flac_compression is not None else preset_config.get('flac_compression')
     allow_fallback_val = allow_fallback or preset_config.get('allow_fallback', False)
     force_software_val = force_software or preset_config.get('force_software', False)
+    encoder_preset_val = encoder_preset or preset_config.get('encoder_preset')
 
     # Get hardware capabilities
-    capabilities = None
-    if capabilities_file and os.path.exists(capabilities_file):
+    if capabilities is None and capabilities_file and os.path.exists(capabilities_file):
         try:
             with open(capabilities_file, 'r') as f:
                 capabilities = json.load(f)
@@ -1071,7 +1306,9 @@ def transcode(
         flac_compression=flac_compression_val,
         overwrite=overwrite,
         quiet=quiet,
-        progress=(non_blocking or progress_callback is not None)  # Enable progress reporting if we need it
+        progress=(non_blocking or progress_callback is not None),  # Enable progress reporting if we need it
+        threads=threads,
+        encoder_preset=encoder_preset_val
     )
 
     # Return the command if dry_run is True
@@ -1086,7 +1323,8 @@ def transcode(
     # Handle non-blocking mode with the TranscodeProcess class
     if non_blocking or progress_callback is not None:
         # Default to no debug output unless explicitly requested
-        process = TranscodeProcess(command, progress_callback, debug=False)
+        process = TranscodeProcess(command, progress_callback, debug=False, nice=nice, cpu_affinity=cpu_affinity,
+                                   duration=duration)
         process.start()
 
         # If non-blocking, return the process object
@@ -1196,6 +1434,7 @@ def cli_main():
     transcode_parser.add_argument("--allow-fallback", action="store_true", help="Allow software fallback")
     transcode_parser.add_argument("--force-software", action="store_true", help="Force software encoding (disables hardware acceleration even if available)")
     transcode_parser.add_argument("--crf", type=int, help="Set CRF value for software encoding (0–51)")
+    transcode_parser.add_argument("--encoder-preset", choices=ENCODER_PRESETS, help="Set x264/x265 speed preset for software encoding")
     transcode_parser.add_argument("--bitrate", help="Set video bitrate (e.g. 2M)")
     transcode_parser.add_argument("--audio-bitrate", help="Set audio bitrate (e.g. 128k)")
     transcode_parser.add_argument("--flac-compression", type=int, choices=range(0, 9), help="FLAC compression level (0–8)")
@@ -1254,6 +1493,7 @@ def cli_main():
         bitrate = args.bitrate or preset_config.get('bitrate')
         audio_bitrate = args.audio_bitrate or preset_config.get('audio_bitrate')
         flac_compression = args.flac_compression if args.flac_compression is not None else preset_config.get('flac_compression')
+        encoder_preset = args.encoder_preset or preset_config.get('encoder_preset')
 
         try:
             command = generate_ffmpeg_command(
@@ -1269,6 +1509,7 @@ def cli_main():
                 bitrate=bitrate,
                 audio_bitrate=audio_bitrate,
                 flac_compression=flac_compression,
+                encoder_preset=encoder_preset,
                 overwrite=args.run  # Enable overwrite when running
             )
             print("Generated FFmpeg command:\n")
@@ -1296,6 +1537,7 @@ def cli_main():
                         bitrate=bitrate,
                         audio_bitrate=audio_bitrate,
                         flac_compression=flac_compression,
+                        encoder_preset=encoder_preset,
                         overwrite=True,
                         quiet=True,  # Suppress duplicated output
                         progress_callback=print_progress
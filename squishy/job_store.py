@@ -0,0 +1,235 @@
+"""Persistent storage for transcoding jobs.
+
+Active and recently finished jobs live in memory in ``squishy.transcoder.JOBS``
+and are written back to a SQLite database so their state survives restarts.
+Older finished jobs are only kept in the database. New jobs are inserted
+immediately; status and progress updates are marked dirty and flushed in
+batches by a background thread.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import fields
+from typing import Dict, List, Optional
+
+from squishy.models import TranscodeJob
+
+logger = logging.getLogger(__name__)
+
+# How often dirty jobs are written back to the database, in seconds
+FLUSH_INTERVAL = 0.5
+
+# Names of the persisted TranscodeJob fields
+JOB_FIELDS = [f.name for f in fields(TranscodeJob)]
+
+_CONN: Optional[sqlite3.Connection] = None
+_DB_LOCK = threading.RLock()
+
+# Jobs waiting to be flushed, keyed by job ID
+_DIRTY: Dict[str, TranscodeJob] = {}
+_DIRTY_LOCK = threading.Lock()
+_FLUSH_THREAD: Optional[threading.Thread] = None
+
+
+def get_db_path() -> str:
+    """Get the path of the jobs database, stored next to the config file."""
+    config_path = os.environ.get("CONFIG_PATH", "./config/config.json")
+    return os.path.join(os.path.dirname(config_path) or ".", "jobs.db")
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """Open the jobs database on first use.
+
+    Returns None if the database can't be opened, in which case jobs are
+    only kept in memory.
+    """
+    global _CONN
+    with _DB_LOCK:
+        if _CONN is not None:
+            return _CONN
+
+        db_path = get_db_path()
+        try:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status_created"
+                " ON jobs (status, created_at)"
+            )
+            conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not open jobs database at {db_path}: {e}")
+            return None
+
+        _CONN = conn
+        return _CONN
+
+
+def _serialize(job: TranscodeJob) -> str:
+    """Serialize a job's fields to JSON."""
+    with job._lock:
+        data = {name: getattr(job, name) for name in JOB_FIELDS}
+        data["ffmpeg_logs"] = list(job.ffmpeg_logs)
+    return json.dumps(data)
+
+
+def _deserialize(data: str) -> TranscodeJob:
+    """Build a job from its JSON representation."""
+    values = json.loads(data)
+    return TranscodeJob(**{k: v for k, v in values.items() if k in JOB_FIELDS})
+
+
+def insert_job(job: TranscodeJob) -> None:
+    """Write a new job to the database immediately."""
+    conn = _connect()
+    if conn is None:
+        return
+
+    now = time.time()
+    try:
+        with _DB_LOCK:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, created_at, updated_at, data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.status, now, now, _serialize(job)),
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to persist job {job.id}: {e}")
+
+
+def save_job(job: TranscodeJob) -> None:
+    """Mark a job as changed so the background thread writes it back."""
+    with _DIRTY_LOCK:
+        _DIRTY[job.id] = job
+    _ensure_flush_thread()
+
+
+def flush() -> None:
+    """Write all changed jobs to the database."""
+    with _DIRTY_LOCK:
+        if not _DIRTY:
+            return
+        jobs = list(_DIRTY.values())
+        _DIRTY.clear()
+
+    conn = _connect()
+    if conn is None:
+        return
+
+    now = time.time()
+    rows = [(job.status, now, _serialize(job), job.id) for job in jobs]
+    try:
+        with _DB_LOCK:
+            conn.executemany(
+                "UPDATE jobs SET status = ?, updated_at = ?, data = ? WHERE id = ?",
+                rows,
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to flush {len(rows)} jobs: {e}")
+
+
+def delete_job(job_id: str) -> None:
+    """Delete a job from the database."""
+    with _DIRTY_LOCK:
+        _DIRTY.pop(job_id, None)
+
+    conn = _connect()
+    if conn is None:
+        return
+
+    try:
+        with _DB_LOCK:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to delete job {job_id}: {e}")
+
+
+def load_job(job_id: str) -> Optional[TranscodeJob]:
+    """Load a single job from the database."""
+    conn = _connect()
+    if conn is None:
+        return None
+
+    try:
+        with _DB_LOCK:
+            row = conn.execute(
+                "SELECT data FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to load job {job_id}: {e}")
+        return None
+
+    return _deserialize(row[0]) if row else None
+
+
+def load_jobs(finished_limit: int) -> List[TranscodeJob]:
+    """Load the active jobs and the newest finished ones, oldest first.
+
+    Older finished jobs stay in the database, where get_job can still find
+    them, but aren't loaded so startup cost doesn't grow with the history.
+    """
+    conn = _connect()
+    if conn is None:
+        return []
+
+    try:
+        with _DB_LOCK:
+            rows = conn.execute(
+                "SELECT data FROM ("
+                " SELECT data, created_at FROM jobs"
+                " WHERE status IN ('pending', 'processing')"
+                " UNION ALL"
+                " SELECT * FROM (SELECT data, created_at FROM jobs"
+                " WHERE status NOT IN ('pending', 'processing')"
+                " ORDER BY created_at DESC LIMIT ?)"
+                ") ORDER BY created_at",
+                (finished_limit,),
+            ).fetchall()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to load jobs: {e}")
+        return []
+
+    return [_deserialize(row[0]) for row in rows]
+
+
+def _flush_loop():
+    """Periodically flush dirty jobs to the database."""
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Error flushing jobs: {e}")
+
+
+def _ensure_flush_thread():
+    """Start the background flush thread if it isn't running yet."""
+    global _FLUSH_THREAD
+    if _FLUSH_THREAD is not None:
+        return
+    with _DIRTY_LOCK:
+        if _FLUSH_THREAD is None:
+            _FLUSH_THREAD = threading.Thread(
+                target=_flush_loop, name="job-store-flush", daemon=True
+            )
+            _FLUSH_THREAD.start()
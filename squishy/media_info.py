@@ -9,6 +9,10 @@ from squishy.config import load_config
 
 logger = logging.getLogger(__name__)
 
+# File size units and their sizes in bytes
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+_SIZE_DIVISORS = tuple(1 << (10 * i) for i in range(len(_SIZE_UNITS)))
+
 
 def get_media_info(file_path: str) -> Dict[str, Any]:
     """
@@ -242,11 +246,8 @@ def _detect_hdr_from_color_info(video_info: Dict[str, Any]) -> Optional[Dict[str
 
 def format_file_size(size_bytes: int) -> str:
     """Format file size in a human-readable way."""
-    if size_bytes < 1024:
+    # Each unit is 2**10 times the previous one
+    unit = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    if unit <= 0:
         return f"{size_bytes} B"
-    elif size_bytes < 1024 * 1024:
-        return f"{round(size_bytes / 1024, 2)} KB"
-    elif size_bytes < 1024 * 1024 * 1024:
-        return f"{round(size_bytes / (1024 * 1024), 2)} MB"
-    else:
-        return f"{round(size_bytes / (1024 * 1024 * 1024), 2)} GB"
\ No newline at end of file
+    return f"{round(size_bytes / _SIZE_DIVISORS[unit], 2)} {_SIZE_UNITS[unit]}"
@@ -1,7 +1,12 @@
 """Data models for Squishy."""
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional
+
+# Maximum number of FFmpeg log lines kept per job
+MAX_LOG_LINES = 1000
 
 
 @dataclass
@@ -21,6 +26,7 @@ class MediaItem:
     rating: Optional[float] = None
     content_rating: Optional[str] = None
     studio: Optional[str] = None
+    duration: Optional[float] = None  # Runtime in seconds, as reported by the media server
 
     @property
     def display_name(self) -> str:
@@ -140,12 +146,16 @@ class TranscodeJob:
     current_time: Optional[float] = None
     process_id: Optional[int] = None  # Store process ID for cancellation
     ffmpeg_command: Optional[str] = None  # Store the FFmpeg command for reference
-    ffmpeg_logs: List[str] = field(default_factory=list)  # Store FFmpeg logs
-    
+    ffmpeg_logs: Deque[str] = field(
+        default_factory=lambda: deque(maxlen=MAX_LOG_LINES)
+    )  # Store FFmpeg logs, oldest entries are dropped automatically
+
     def __post_init__(self):
         """Initialize a lock for thread-safe attribute updates."""
         import threading
         self._lock = threading.RLock()
+        if not isinstance(self.ffmpeg_logs, deque):
+            self.ffmpeg_logs = deque(self.ffmpeg_logs, maxlen=MAX_LOG_LINES)
     
     def update_progress(self, current_time: float):
         """Thread-safe update of progress."""
@@ -167,7 +177,35 @@ class TranscodeJob:
     def update_logs(self, logs: List[str]):
         """Thread-safe update of logs."""
         with self._lock:
-            self.ffmpeg_logs = logs
+            self.ffmpeg_logs = deque(logs, maxlen=MAX_LOG_LINES)
+
+    def recent_logs(self, count: Optional[int] = None) -> List[str]:
+        """Thread-safe snapshot of the last ``count`` log lines (all if None)."""
+        with self._lock:
+            if count is None:
+                return list(self.ffmpeg_logs)
+            tail = list(islice(reversed(self.ffmpeg_logs), count))
+        tail.reverse()
+        return tail
+
+    def emit_payload(self, *fields: str, log_count: Optional[int] = None) -> Dict[str, Any]:
+        """Thread-safe snapshot of the job for a socket update.
+
+        Always includes the id, media_id, status and progress, plus the named
+        fields and, if log_count is given, the last log_count log lines.
+        """
+        with self._lock:
+            payload = {
+                "id": self.id,
+                "media_id": self.media_id,
+                "status": self.status,
+                "progress": self.progress,
+            }
+            for name in fields:
+                payload[name] = getattr(self, name)
+            if log_count is not None:
+                payload["ffmpeg_logs"] = self.recent_logs(log_count)
+        return payload
 
     @property
     def is_complete(self) -> bool:
@@ -180,3 +218,30 @@ class TranscodeJob:
         """Check if the job is active (pending or processing)."""
         with self._lock:
             return self.status in ("pending", "processing")
+
+
+@dataclass(slots=True)
+class SidecarMetadata:
+    """Metadata written next to a transcoded file as ``<output>.json``."""
+
+    original_path: str
+    media_id: str
+    title: str
+    year: Optional[int]
+    type: str
+    poster_url: Optional[str]
+    thumbnail_url: Optional[str]
+    preset_name: str
+    completed_at: str
+    output_size: Optional[str]
+    duration: Optional[float]
+
+
+@dataclass(slots=True, kw_only=True)
+class EpisodeSidecarMetadata(SidecarMetadata):
+    """Sidecar metadata for a transcoded TV show episode."""
+
+    show_id: str
+    season_number: int
+    episode_number: Optional[int]
+    show_title: Optional[str] = None
@@ -46,20 +46,30 @@ def apply_path_mapping(path: str) -> str:
     )
 
     # Before we apply any mappings, log the original path
-    logging.debug(f"Applying path mapping to: {path}")
+    logging.debug("Applying path mapping to: %s", path)
 
     # Try each mapping
     for source_path, target_path in sorted_mappings:
         if source_path and target_path and path.startswith(source_path):
             new_path = path.replace(source_path, target_path, 1)
-            logging.debug(f"Path mapped: {path} -> {new_path}")
+            logging.debug("Path mapped: %s -> %s", path, new_path)
             return new_path
 
     # No mapping applied
-    logging.debug(f"No path mapping applied, using original: {path}")
+    logging.debug("No path mapping applied, using original: %s", path)
     return path
 
 
+def _plex_duration(milliseconds: Optional[int]) -> Optional[float]:
+    """Convert a Plex duration in milliseconds to seconds."""
+    return milliseconds / 1000 if milliseconds else None
+
+
+def _jellyfin_duration(ticks: Optional[int]) -> Optional[float]:
+    """Convert a Jellyfin RunTimeTicks value (100ns units) to seconds."""
+    return ticks / 10_000_000 if ticks else None
+
+
 class MediaServerScanner(ABC):
     """Base class for media server scanners."""
 
@@ -197,7 +207,7 @@ class PlexScanner(MediaServerScanner):
 
             # Check if the path exists, unless we're skipping that check
             if not self.path_exists(mapped_path):
-                logging.debug(f"Movie path not found: {mapped_path}")
+                logging.debug("Movie path not found: %s", mapped_path)
                 self.stats["path_not_found"] += 1
                 return None
 
@@ -257,6 +267,9 @@ class PlexScanner(MediaServerScanner):
                 rating=movie_item.get("rating"),
                 content_rating=movie_item.get("contentRating"),
                 studio=movie_item.get("studio"),
+                duration=_plex_duration(
+                    media.get("duration") or movie_item.get("duration")
+                ),
             )
 
             return movie
@@ -364,7 +377,7 @@ class PlexScanner(MediaServerScanner):
 
                 # Check if the path exists, unless we're skipping that check
                 if not self.path_exists(mapped_path):
-                    logging.debug(f"Episode path not found: {mapped_path}")
+                    logging.debug("Episode path not found: %s", mapped_path)
                     self.stats["path_not_found"] += 1
                     return None
 
@@ -397,6 +410,9 @@ class PlexScanner(MediaServerScanner):
                     overview=episode_item.get("summary"),
                     air_date=episode_item.get("originallyAvailableAt"),
                     rating=episode_item.get("rating"),
+                    duration=_plex_duration(
+                        media.get("duration") or episode_item.get("duration")
+                    ),
                 )
 
                 return episode
@@ -464,7 +480,7 @@ class PlexScanner(MediaServerScanner):
         items_response = requests.get(
             f"{self.url}/library/sections/{section_id}/all",
             params={
-                "includeFields": "summary,originallyAvailableAt,rating,contentRating,thumb,art,tagline,studio,genre,director,role,year"
+                "includeFields": "summary,originallyAvailableAt,rating,contentRating,thumb,art,tagline,studio,genre,director,role,year,duration"
             },
             headers=self.get_headers(),
         )
@@ -556,7 +572,7 @@ class PlexScanner(MediaServerScanner):
         episodes_response = requests.get(
             f"{self.url}/library/metadata/{show_key}/allLeaves",
             params={
-                "includeFields": "summary,originallyAvailableAt,rating,contentRating,thumb,art,year,index,parentIndex"
+                "includeFields": "summary,originallyAvailableAt,rating,contentRating,thumb,art,year,index,parentIndex,duration"
             },
             headers=self.get_headers(),
         )
@@ -570,7 +586,7 @@ class PlexScanner(MediaServerScanner):
 
                 # Only count episodes from enabled libraries
                 logging.debug(
-                    f"Found {len(episode_list)} episodes for show {show.title}"
+                    "Found %d episodes for show %s", len(episode_list), show.title
                 )
                 self.stats["total_episodes_found"] += len(episode_list)
 
@@ -839,6 +855,7 @@ class JellyfinScanner(MediaServerScanner):
                         rating=item.get("CommunityRating"),
                         content_rating=item.get("OfficialRating"),
                         studio=studio,
+                        duration=_jellyfin_duration(item.get("RunTimeTicks")),
                     )
 
                     movies.append(movie)
@@ -1004,7 +1021,8 @@ class JellyfinScanner(MediaServerScanner):
                     or series_id not in shows_by_id
                 ):
                     logging.debug(
-                        f"Episode path not found or series ID not found: {mapped_path}"
+                        "Episode path not found or series ID not found: %s",
+                        mapped_path,
                     )
                     self.stats["path_not_found"] += 1
                     self.stats["skipped_episodes"] += 1
@@ -1029,6 +1047,7 @@ class JellyfinScanner(MediaServerScanner):
                     thumbnail_url=f"{self.url.rstrip('/')}/Items/{item['Id']}/Images/Primary?API_KEY={self.token}",
                     overview=item.get("Overview"),
                     air_date=item.get("PremiereDate"),
+                    duration=_jellyfin_duration(item.get("RunTimeTicks")),
                 )
 
                 # Add to TV show
@@ -1,6 +1,8 @@
 """Media transcoding functionality."""
 
+import copy
 import os
+import shutil
 import uuid
 import threading
 import logging
@@ -10,30 +12,112 @@ import json
 import datetime
 import signal
 import time
-from typing import Dict, Optional, List, Callable, Any
-
-from squishy.config import load_config
-from squishy.models import TranscodeJob, MediaItem, Episode
-from squishy.scanner import get_media
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from squishy import job_store
+from squishy.config import Config, load_config
+from squishy.media_info import format_file_size
+from squishy.models import (
+    MAX_LOG_LINES,
+    EpisodeSidecarMetadata,
+    SidecarMetadata,
+    TranscodeJob,
+    MediaItem,
+    Episode,
+)
+from squishy.scanner import get_show
 from squishy.effeffmpeg.effeffmpeg import (
+    TranscodeProcess,
     transcode as effeff_transcode,
     detect_capabilities,
+    list_render_devices,
 )
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# In-memory job store
+# In-memory job cache, written back to the persistent job store
 JOBS: Dict[str, TranscodeJob] = {}
-JOBS_LOCK = threading.RLock()  # Use RLock to allow re-entry from the same thread
 
-# Job queue for pending jobs
-JOB_QUEUE: List[Dict] = []
-JOB_QUEUE_LOCK = threading.RLock()
+# IDs of pending and processing jobs, kept in sync by _set_status so that
+# status queries don't have to scan every job ever created
+_PENDING_IDS: Set[str] = set()
+_PROCESSING_IDS: Set[str] = set()
+
+# Maximum number of finished jobs kept in memory; older ones stay in the job
+# store and are loaded on demand by get_job
+MAX_FINISHED_JOBS = 200
+_FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# IDs of the finished jobs in JOBS, oldest first
+_FINISHED_IDS: "OrderedDict[str, None]" = OrderedDict()
+
+# Job queue for pending jobs, keyed by job ID in FIFO order so cancelling a
+# queued job doesn't have to search the queue
+JOB_QUEUE: "OrderedDict[str, Dict]" = OrderedDict()
 
 # Currently running jobs
 RUNNING_JOBS = set()
-RUNNING_JOBS_LOCK = threading.RLock()
+
+# FFmpeg processes attached to running jobs, keyed by job ID; a job only has
+# an entry while its monitor loop is following the process
+_ACTIVE_PROCESSES: Dict[str, TranscodeProcess] = {}
+
+# Single lock guarding JOBS, the status indexes, JOB_QUEUE, RUNNING_JOBS and
+# _ACTIVE_PROCESSES so that scheduling decisions see a consistent view. Use
+# RLock to allow re-entry from the same thread.
+_STATE_LOCK = threading.RLock()
+
+# Signalled when a job is queued or finishes so the scheduler thread can
+# dispatch queued jobs
+_SCHED_COND = threading.Condition(_STATE_LOCK)
+
+# Small pool that writes metadata sidecars after jobs complete
+_SIDECAR_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sidecar")
+
+# Worker pool that runs transcoding jobs, created on first use
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_WORKERS = 0
+
+# Thread that dispatches queued jobs, started by init_transcoder
+_SCHEDULER_THREAD: Optional[threading.Thread] = None
+
+# Detected hardware capabilities keyed by (ffmpeg binary, mtime)
+_CAPABILITIES_CACHE: Dict[Tuple[str, Optional[int]], Dict[str, Any]] = {}
+_CAPABILITIES_LOCK = threading.Lock()
+
+# Current time and duration in the status text passed to the progress
+# callback (e.g., "Time: 00:01:23.45/01:30:00.00, Frame: ...")
+_STATUS_TIME_RE = re.compile(
+    r"Time:\s*(\d+):(\d+):([\d.]+)(?:\s*/\s*(\d+):(\d+):([\d.]+))?"
+)
+
+# Hardware failures keyed by preset codec/scale and input video format; jobs
+# matching one go straight to software encoding. Cleared whenever hardware
+# capabilities are re-detected.
+_HW_FAILURES: Set[Tuple] = set()
+
+# Number of trailing FFmpeg output lines logged when a transcode fails
+FAILURE_LOG_LINES = 20
+
+# Maximum number of seconds to wait for ffprobe
+FFPROBE_TIMEOUT = 30
+
+# socket_events.emit_job_update, resolved on first use
+_EMIT_JOB_UPDATE: Optional[Callable] = None
+
+# Maximum number of seconds between checks of a running FFmpeg process
+MONITOR_INTERVAL = 2.0
+
+# Minimum number of seconds between progress updates emitted over the socket
+PROGRESS_EMIT_INTERVAL = 2.0
+
+# Minimum number of seconds between output file size checks while transcoding
+OUTPUT_STAT_INTERVAL = 2.0
 
 
 def create_job(media_item: MediaItem, preset_name: str) -> TranscodeJob:
@@ -48,202 +132,260 @@ def create_job(media_item: MediaItem, preset_name: str) -> TranscodeJob:
         preset_name=preset_name,
         status="pending",
     )
-    with JOBS_LOCK:
+    with _STATE_LOCK:
         JOBS[job_id] = job
+        _PENDING_IDS.add(job_id)
+    job_store.insert_job(job)
     logger.debug(f"Created job with id={job_id}")
     return job
 
 
 def get_job(job_id: str) -> Optional[TranscodeJob]:
-    """Get a job by ID."""
-    logger.debug(f"Getting job with id={job_id}")
-    with JOBS_LOCK:
-        return JOBS.get(job_id)
+    """Get a job by ID, falling back to the persistent job store."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Getting job with id={job_id}")
+    with _STATE_LOCK:
+        job = JOBS.get(job_id)
+    if job is None:
+        # Only finished jobs are evicted, so one loaded from the store isn't
+        # cached again; that would bring it back into the job list
+        job = job_store.load_job(job_id)
+    return job
+
+
+def _restore_jobs():
+    """Load persisted jobs into the in-memory cache.
+
+    Jobs that were pending or processing when the server stopped can't be
+    resumed, so they are marked as failed.
+    """
+    for job in job_store.load_jobs(MAX_FINISHED_JOBS):
+        if job.status in ("pending", "processing"):
+            job.status = "failed"
+            job.error_message = "Interrupted by server restart"
+            job.process_id = None
+            job_store.save_job(job)
+        with _STATE_LOCK:
+            JOBS[job.id] = job
+            # Jobs load oldest first, so only the newest finished ones stay
+            _track_finished(job.id)
+    logger.debug(f"Restored {len(JOBS)} jobs from the job store")
+
+
+def _set_status(job: TranscodeJob, status: str):
+    """Update a job's status and move it between the status indexes."""
+    with _STATE_LOCK:
+        job.update_status(status)
+        _PENDING_IDS.discard(job.id)
+        _PROCESSING_IDS.discard(job.id)
+        if status == "pending":
+            _PENDING_IDS.add(job.id)
+        elif status == "processing":
+            _PROCESSING_IDS.add(job.id)
+        elif status in _FINISHED_STATUSES:
+            _track_finished(job.id)
+
+
+def _track_finished(job_id: str):
+    """Record a finished job, evicting the oldest ones from memory.
+
+    Called with _STATE_LOCK held. Evicted jobs remain in the job store.
+    """
+    _FINISHED_IDS[job_id] = None
+    _FINISHED_IDS.move_to_end(job_id)
+    while len(_FINISHED_IDS) > MAX_FINISHED_JOBS:
+        old_id, _ = _FINISHED_IDS.popitem(last=False)
+        JOBS.pop(old_id, None)
+
+
+def get_jobs() -> List[TranscodeJob]:
+    """Get a snapshot of the jobs in memory, safe to iterate while jobs change."""
+    with _STATE_LOCK:
+        return list(JOBS.values())
 
 
 def get_running_job_count():
     """Get the number of currently running jobs."""
-    with JOBS_LOCK:
-        return len([j for j in JOBS.values() if j.status == "processing"])
+    with _STATE_LOCK:
+        return len(_PROCESSING_IDS)
 
 
 def get_pending_jobs():
     """Get a list of all pending jobs from the JOBS dictionary."""
-    with JOBS_LOCK:
-        return [j for j in JOBS.values() if j.status == "pending"]
+    with _STATE_LOCK:
+        return [JOBS[job_id] for job_id in _PENDING_IDS if job_id in JOBS]
+
 
+def _process_job_queue():
+    """Start queued jobs until the queue is empty or the concurrency limit is reached.
 
-def process_job_queue():
-    """Process the job queue based on the concurrency limit."""
+    Called by the scheduler thread with _STATE_LOCK held.
+    """
     config = load_config()
     max_jobs = config.max_concurrent_jobs
 
-    # Check if we can start more jobs
-    current_running = get_running_job_count()
-    available_slots = max(0, max_jobs - current_running)
+    with _STATE_LOCK:
+        available_slots = max(0, max_jobs - get_running_job_count())
 
-    # Get queue length with thread safety
-    with JOB_QUEUE_LOCK:
-        queue_length = len(JOB_QUEUE)
-
-    logger.debug(
-        f"Processing job queue: current_running={current_running}, max_jobs={max_jobs}, available_slots={available_slots}, queue_length={queue_length}"
-    )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Processing job queue: available_slots={available_slots}, queue_length={len(JOB_QUEUE)}"
+            )
 
-    # Also check for any pending jobs in the JOBS dictionary that might not be in the queue
-    pending_jobs = get_pending_jobs()
-    logger.debug(f"Found {len(pending_jobs)} pending jobs in the JOBS dictionary")
-
-    # First handle jobs in the JOB_QUEUE
-    jobs_to_process = []  # Initialize outside the conditional to avoid UnboundLocalError
-
-    if available_slots > 0:
-        with JOB_QUEUE_LOCK:
-            if JOB_QUEUE:
-                logger.debug(f"Starting up to {available_slots} jobs from queue")
-                # Get the next job(s) from the queue
-                jobs_to_start = min(available_slots, len(JOB_QUEUE))
-
-                # Get jobs from queue while holding the lock
-                for _ in range(jobs_to_start):
-                    if not JOB_QUEUE:
-                        break
-                    # Pop job data from the queue
-                    jobs_to_process.append(JOB_QUEUE.pop(0))
-
-        # Process jobs outside the lock to avoid holding it for too long
-        for job_data in jobs_to_process:
-            job_id = job_data["job_id"]
-            media_item = job_data["media_item"]
-            preset_name = job_data["preset_name"]
-            output_dir = job_data["output_dir"]
+        while available_slots > 0 and JOB_QUEUE:
+            job_id, job_data = JOB_QUEUE.popitem(last=False)
 
             job = get_job(job_id)
             if job and job.status == "pending":
                 # Start the job
-                _start_transcode_job(job, media_item, preset_name, output_dir)
-                logger.debug(f"Started queued job {job_id}, jobs remaining in queue")
+                _start_transcode_job(
+                    job,
+                    job_data["media_item"],
+                    job_data["preset_name"],
+                    job_data["output_dir"],
+                    config,
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Started queued job {job_id}, {len(JOB_QUEUE)} jobs remaining in queue")
                 available_slots -= 1
             else:
                 logger.warning(
                     f"Job {job_id} in queue is not in pending state or doesn't exist anymore"
                 )
 
-    # If we still have available slots and there are pending jobs not in the queue,
-    # we need to find the media items and presets to start them
-    if available_slots > 0 and pending_jobs:
-        logger.debug(
-            f"Looking for pending jobs not in the queue: available_slots={available_slots}, pending_jobs={len(pending_jobs)}"
-        )
-
-        # Get the list of job IDs already in the queue
-        with JOB_QUEUE_LOCK:
-            queued_job_ids = [job_data["job_id"] for job_data in JOB_QUEUE]
-
-        # Find the pending jobs not in the queue
-        for job in pending_jobs:
-            # Skip if job is already in the queue
-            if job.id in queued_job_ids:
-                continue
-
-            # Get the media item and preset
-            config = load_config()
-
-            media_item = get_media(job.media_id)
-            if not media_item:
-                logger.warning(
-                    f"Media item {job.media_id} for pending job {job.id} not found"
-                )
-                continue
-
-            preset_name = job.preset_name
-            if preset_name not in config.presets:
-                logger.warning(
-                    f"Preset {preset_name} for pending job {job.id} not found"
-                )
-                continue
 
-            output_dir = config.transcode_path
+def wake_scheduler():
+    """Ask the scheduler thread to re-check the queue, e.g. after a config change."""
+    with _SCHED_COND:
+        _SCHED_COND.notify()
 
-            # Start the job
-            _start_transcode_job(job, media_item, preset_name, output_dir)
-            logger.debug(f"Started pending job {job.id} that was not in queue")
 
-            available_slots -= 1
-            if available_slots <= 0:
-                break
+def _scheduler_loop():
+    """Wait for enqueue/finish events and dispatch queued jobs."""
+    with _SCHED_COND:
+        while True:
+            try:
+                _process_job_queue()
+            except Exception as e:
+                logger.error(f"Error processing job queue: {str(e)}", exc_info=True)
+            _SCHED_COND.wait()
 
 
 def start_transcode(
     job: TranscodeJob, media_item: MediaItem, preset_name: str, output_dir: str
 ):
     """Start or queue a transcoding job based on concurrency limits."""
-    logger.debug(
-        f"Starting transcode job={job.id} for media={media_item.id}, preset={preset_name}"
-    )
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug(
+            f"Starting transcode job={job.id} for media={media_item.id}, preset={preset_name}"
+        )
 
     config = load_config()
 
     if preset_name in config.presets:
-        preset = config.presets[preset_name]
-        logger.debug(
-            f"Preset settings: scale={preset.get('scale')}, codec={preset.get('codec')}, "
-            f"container={preset.get('container')}, crf={preset.get('crf')}, bitrate={preset.get('bitrate')}"
-        )
+        if debug:
+            preset = config.presets[preset_name]
+            logger.debug(
+                f"Preset settings: scale={preset.get('scale')}, codec={preset.get('codec')}, "
+                f"container={preset.get('container')}, crf={preset.get('crf')}, bitrate={preset.get('bitrate')}"
+            )
     else:
         logger.warning(f"Preset {preset_name} not found in configuration")
 
     max_jobs = config.max_concurrent_jobs
 
-    # Check if we can start the job immediately
-    current_running = get_running_job_count()
+    # Decide and act under the lock so two requests can't both take the last slot
+    with _SCHED_COND:
+        if get_running_job_count() < max_jobs and not JOB_QUEUE:
+            # Start the job immediately
+            _start_transcode_job(job, media_item, preset_name, output_dir, config)
+            if debug:
+                logger.debug(f"Started job {job.id} immediately")
+            return
+
+        JOB_QUEUE[job.id] = {
+            "job_id": job.id,
+            "media_item": media_item,
+            "preset_name": preset_name,
+            "output_dir": output_dir,
+        }
+        queue_position = len(JOB_QUEUE)
+        _SCHED_COND.notify()
+
+    if debug:
+        logger.debug(f"Queued job {job.id}, position in queue: {queue_position}")
 
-    if current_running < max_jobs:
-        # Start the job immediately
-        _start_transcode_job(job, media_item, preset_name, output_dir)
-        logger.debug(f"Started job {job.id} immediately")
-    else:
-        # Queue the job with thread safety
-        with JOB_QUEUE_LOCK:
-            JOB_QUEUE.append(
-                {
-                    "job_id": job.id,
-                    "media_item": media_item,
-                    "preset_name": preset_name,
-                    "output_dir": output_dir,
-                }
-            )
-            queue_position = len(JOB_QUEUE)
 
-        logger.debug(f"Queued job {job.id}, position in queue: {queue_position}")
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Get the shared worker pool, growing it if the concurrency limit was raised.
+
+    The scheduler enforces max_concurrent_jobs, so the pool only has to be
+    large enough that a dispatched job never waits for a worker. Replaced
+    pools are shut down without waiting; their running jobs finish normally.
+    """
+    global _EXECUTOR, _EXECUTOR_WORKERS
+    with _STATE_LOCK:
+        if _EXECUTOR is None or max_workers > _EXECUTOR_WORKERS:
+            if _EXECUTOR is not None:
+                _EXECUTOR.shutdown(wait=False)
+            _EXECUTOR_WORKERS = max(1, max_workers)
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=_EXECUTOR_WORKERS, thread_name_prefix="transcode"
+            )
+        return _EXECUTOR
 
 
 def _start_transcode_job(
-    job: TranscodeJob, media_item: MediaItem, preset_name: str, output_dir: str
+    job: TranscodeJob,
+    media_item: MediaItem,
+    preset_name: str,
+    output_dir: str,
+    config: Config,
 ):
     """Internal function to start a transcoding job."""
-    # Add to running jobs set with thread safety
-    with RUNNING_JOBS_LOCK:
+    with _STATE_LOCK:
+        # Claim the slot before the thread starts so the running count is
+        # accurate for the next scheduling decision
+        _set_status(job, "processing")
         RUNNING_JOBS.add(job.id)
 
     # Define a callback for when the job finishes
     def job_finished_callback():
-        # Remove from running jobs with thread safety
-        with RUNNING_JOBS_LOCK:
-            if job.id in RUNNING_JOBS:
-                RUNNING_JOBS.remove(job.id)
+        with _SCHED_COND:
+            RUNNING_JOBS.discard(job.id)
+            # Wake the scheduler to fill the freed slot
+            _SCHED_COND.notify()
+
+    # Run the job on a pooled worker thread; the FFmpeg wait happens there,
+    # outside the lock
+    _get_executor(config.max_concurrent_jobs).submit(
+        transcode_thread,
+        job,
+        media_item,
+        preset_name,
+        output_dir,
+        job_finished_callback,
+        config,
+    )
 
-        # Process the queue to see if we can start more jobs
-        process_job_queue()
+    logger.debug(f"Submitted transcoding job {job.id} to the worker pool")
 
-    # Start the job in a thread
-    threading.Thread(
-        target=transcode_thread,
-        args=(job, media_item, preset_name, output_dir, job_finished_callback),
-        daemon=True,
-    ).start()
 
-    logger.debug(f"Started transcoding thread for job {job.id}")
+def _get_emit_job_update() -> Optional[Callable]:
+    """Get socket_events.emit_job_update, importing it on first use.
+
+    The import is deferred to avoid circular imports and resolved only once.
+    Returns None if socket_events can't be imported.
+    """
+    global _EMIT_JOB_UPDATE
+    if _EMIT_JOB_UPDATE is None:
+        try:
+            from squishy.socket_events import emit_job_update
+        except ImportError:
+            return None  # Ignore if socket_events can't be imported
+        _EMIT_JOB_UPDATE = emit_job_update
+    return _EMIT_JOB_UPDATE
 
 
 def transcode_thread(
@@ -252,52 +394,311 @@ def transcode_thread(
     preset_name: str,
     output_dir: str,
     callback: Optional[Callable] = None,
+    config: Optional[Config] = None,
 ):
     """Thread function for transcoding."""
     try:
-        # Import here to avoid circular imports
-        from squishy.socket_events import emit_job_update
+        emit_job_update = _get_emit_job_update()
 
         # Emit initial job state
-        emit_job_update(
-            {
-                "id": job.id,
-                "media_id": job.media_id,
-                "status": job.status,
-                "progress": job.progress,
-            }
-        )
+        if emit_job_update:
+            emit_job_update(job.emit_payload())
 
-        transcode(job, media_item, preset_name, output_dir)
+        transcode(job, media_item, preset_name, output_dir, config)
 
         # Emit final job state
-        emit_job_update(
-            {
-                "id": job.id,
-                "media_id": job.media_id,
-                "status": job.status,
-                "progress": job.progress,
-                "output_path": job.output_path,
-                "output_size": job.output_size,
-            }
-        )
+        if emit_job_update:
+            emit_job_update(job.emit_payload("output_path", "output_size"))
     finally:
         # Call the callback if provided
         if callback:
             callback()
 
 
+@dataclass(frozen=True)
+class TranscodeStrategy:
+    """One way of running a transcode, tried in order until one succeeds."""
+
+    name: str
+    preset_overrides: Dict[str, Any] = field(default_factory=dict)
+    notice: Optional[str] = None  # Logged when this strategy is used as a fallback
+
+
+# Strategies tried for a job. A later strategy only runs if the previous
+# attempt used hardware acceleration and failed.
+TRANSCODE_STRATEGIES = [
+    TranscodeStrategy("default"),
+    TranscodeStrategy(
+        "software",
+        {"force_software": True},
+        "Hardware encoding failed, retrying with software encoding",
+    ),
+]
+
+
+def _strategies_for(
+    preset: Dict[str, Any], input_format: Optional[Tuple[str, ...]] = None
+) -> List[TranscodeStrategy]:
+    """Get the strategies to try for a preset and input video format.
+
+    Software fallback is opt-in, matching effeffmpeg's allow_fallback default.
+    """
+    if preset.get("force_software") or not preset.get("allow_fallback", False):
+        return TRANSCODE_STRATEGIES[:1]
+    if _hw_failure_key(preset, input_format) in _HW_FAILURES:
+        # Hardware already failed for this kind of input, don't try it again
+        return TRANSCODE_STRATEGIES[1:]
+    return TRANSCODE_STRATEGIES
+
+
+def _hw_failure_key(
+    preset: Dict[str, Any], input_format: Optional[Tuple[str, ...]]
+) -> Optional[Tuple]:
+    """Key used to remember hardware failures for a preset's codec and an input format."""
+    if input_format is None:
+        return None
+    return (preset.get("codec"), preset.get("scale"), *input_format)
+
+
+def _copy_new_output(
+    job: TranscodeJob, process: TranscodeProcess, read_positions: List[int]
+) -> None:
+    """Append process output captured since the last call to the job logs.
+
+    read_positions holds how many stdout and stderr buffer lines have already
+    been copied and is advanced in place, so each line is only looked at once.
+    """
+    stdout_lines = process.stdout_buffer[read_positions[0]:]
+    stderr_lines = process.stderr_buffer[read_positions[1]:]
+    if not stdout_lines and not stderr_lines:
+        return
+    read_positions[0] += len(stdout_lines)
+    read_positions[1] += len(stderr_lines)
+
+    new_logs = []
+    if stdout_lines:
+        # Progress key=value pairs repeat on every update, so skip values
+        # already in the recent logs. Log lines never contain newlines, so one
+        # substring search of the joined logs matches the same lines.
+        recent = "\n".join(job.recent_logs(100))
+        new_logs.extend(
+            f"STDOUT: {line}"
+            for line in stdout_lines
+            if line.strip() and line not in recent
+        )
+    new_logs.extend(f"STDERR: {line}" for line in stderr_lines if line.strip())
+
+    # Add new logs to job logs; the bounded deque drops the oldest
+    if new_logs:
+        with job._lock:
+            job.ffmpeg_logs.extend(new_logs)
+
+
+def _monitor_process(
+    job: TranscodeJob,
+    process: TranscodeProcess,
+    output_path: str,
+) -> Optional[int]:
+    """Follow a running FFmpeg process, copying its output into the job.
+
+    Returns:
+        The process return code, or None if the job was cancelled.
+    """
+    # Attach the process so cancel_job can signal it
+    with _STATE_LOCK:
+        _ACTIVE_PROCESSES[job.id] = process
+        with job._lock:
+            job.process_id = process.process.pid
+    logger.debug(f"Process ID for job {job.id}: {process.process.pid}")
+
+    last_stat = 0.0
+    last_output_size = None
+    # Number of stdout/stderr buffer lines already copied into the job logs
+    read_positions = [0, 0]
+    # Read-only descriptor for the output file, opened once it exists
+    size_fd = None
+    try:
+        while not process.finished:
+            # Check if job has been cancelled
+            with job._lock:
+                is_cancelled = job.status == "cancelled"
+
+            if is_cancelled:
+                logger.info(f"Job {job.id} has been cancelled, terminating process")
+                process.terminate()
+                return None
+
+            # Update output file size at most every OUTPUT_STAT_INTERVAL seconds.
+            # Once FFmpeg has created the file, keep it open and fstat it
+            # rather than resolving the path each time.
+            now = time.monotonic()
+            if now - last_stat >= OUTPUT_STAT_INTERVAL:
+                last_stat = now
+                if size_fd is None:
+                    try:
+                        size_fd = os.open(output_path, os.O_RDONLY)
+                    except FileNotFoundError:
+                        pass
+                if size_fd is not None:
+                    output_size = os.fstat(size_fd).st_size
+                    if output_size != last_output_size:
+                        last_output_size = output_size
+                        job.update_output_size(format_file_size(output_size))
+
+            # Copy output captured since the last check into the job logs
+            _copy_new_output(job, process, read_positions)
+
+            # Use process.poll() instead of wait with timeout to check if it's still running
+            # This avoids the TimeoutExpired exception when using eventlet's patched subprocess
+            if process.process.poll() is not None:
+                # Process completed
+                process.finished = True
+                process.returncode = process.process.returncode
+
+                # Let the reader drain the pipe, then collect any final output
+                if process.reader_thread:
+                    process.reader_thread.join(timeout=1)
+                _copy_new_output(job, process, read_positions)
+
+                break
+
+            # Sleep until the next update is due, waking as soon as FFmpeg
+            # closes its output because it exited or cancel_job killed it
+            if process.reader_thread.is_alive():
+                process.reader_thread.join(MONITOR_INTERVAL)
+            else:
+                # Output is closed but the process hasn't been reaped yet
+                time.sleep(0.1)
+    finally:
+        if size_fd is not None:
+            os.close(size_fd)
+        # The process has exited or been terminated, so its PID may be
+        # reused from here on
+        with _STATE_LOCK:
+            _ACTIVE_PROCESSES.pop(job.id, None)
+            with job._lock:
+                job.process_id = None
+
+    return process.returncode
+
+
+def _complete_job(job: TranscodeJob, output_path: str) -> None:
+    """Mark a job as completed and record its output file and size."""
+    _set_status(job, "completed")
+
+    with job._lock:
+        job.progress = 1.0
+        job.output_path = output_path
+
+    # A single stat both checks the output exists and gets its size
+    try:
+        job.update_output_size(format_file_size(os.stat(output_path).st_size))
+    except FileNotFoundError:
+        pass
+
+    job_store.save_job(job)
+
+
+def _write_sidecar(
+    job: TranscodeJob, media_item: MediaItem, preset_name: str, output_path: str
+) -> None:
+    """Write the JSON metadata sidecar for a completed transcode."""
+    try:
+        _write_sidecar_file(job, media_item, preset_name, output_path)
+    except Exception as e:
+        # Runs on the sidecar pool, where an exception would go unnoticed
+        logger.error(
+            f"Failed to write metadata sidecar for job {job.id}: {str(e)}",
+            exc_info=True,
+        )
+
+
+def _write_sidecar_file(
+    job: TranscodeJob, media_item: MediaItem, preset_name: str, output_path: str
+) -> None:
+    """Build the sidecar metadata for a transcode and write it atomically."""
+    sidecar_path = f"{output_path}.json"
+
+    # Handle poster_url and thumbnail_url differently for Movies vs Episodes
+    poster_url = None
+    thumbnail_url = None
+    show = None
+
+    if isinstance(media_item, Episode):
+        # For episodes, we want to use the parent show's poster as the poster_url
+        # and the episode's thumbnail as the thumbnail_url
+        show = get_show(media_item.show_id)
+        if show:
+            poster_url = show.poster_url
+        # Use the episode's thumbnail_url if available, otherwise fall back to poster_url
+        thumbnail_url = media_item.thumbnail_url or media_item.poster_url
+    else:
+        # For movies, use the movie's poster_url as poster
+        poster_url = media_item.poster_url
+        # Use movie's thumbnail_url if available, otherwise fall back to poster_url
+        thumbnail_url = media_item.thumbnail_url or media_item.poster_url
+
+    common = dict(
+        original_path=media_item.path,
+        media_id=media_item.id,
+        title=media_item.title,
+        year=media_item.year,
+        type=media_item.type,
+        poster_url=poster_url,
+        thumbnail_url=thumbnail_url,
+        preset_name=preset_name,
+        completed_at=datetime.datetime.now().isoformat(),
+        output_size=job.output_size,
+        duration=job.duration,
+    )
+
+    # Add TV show specific metadata if applicable
+    if isinstance(media_item, Episode):
+        metadata = EpisodeSidecarMetadata(
+            **common,
+            show_id=media_item.show_id,
+            season_number=media_item.season_number,
+            episode_number=media_item.episode_number,
+            show_title=show.title if show else None,
+        )
+    else:
+        metadata = SidecarMetadata(**common)
+
+    # Write metadata to a temporary file and move it into place, so
+    # the completed list never reads a partially written sidecar
+    data = json.dumps(asdict(metadata), indent=2)
+    tmp_path = f"{sidecar_path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(data)
+    os.replace(tmp_path, sidecar_path)
+
+    logger.debug(f"Created metadata sidecar file: {sidecar_path}")
+
+
 def transcode(
-    job: TranscodeJob, media_item: MediaItem, preset_name: str, output_dir: str
+    job: TranscodeJob,
+    media_item: MediaItem,
+    preset_name: str,
+    output_dir: str,
+    config: Optional[Config] = None,
 ):
-    """Perform the transcoding using effeffmpeg."""
+    """Perform the transcoding using effeffmpeg.
+
+    The config loaded by the scheduler is passed in so it isn't read from
+    disk again; it is only loaded here when transcode is called directly.
+    """
     try:
-        # Update status with thread safety
-        job.update_status("processing")
-        logger.debug(f"Job {job.id} status changed to processing")
+        # The scheduler already marked the job as processing; if it was
+        # cancelled before this worker picked it up, don't revive it
+        with _STATE_LOCK:
+            if job.status != "processing":
+                logger.info(f"Job {job.id} is {job.status}, not starting it")
+                return
+        job_store.save_job(job)
 
         # Always use the configured transcode_path from config
-        config = load_config()
+        if config is None:
+            config = load_config()
         output_dir = config.transcode_path
         logger.info(f"Using configured transcode_path: {output_dir}")
 
@@ -305,7 +706,8 @@ def transcode(
         if preset_name not in config.presets:
             raise ValueError(f"Preset '{preset_name}' not found in configuration")
 
-        preset = config.presets[preset_name]
+        # Copy the preset so per-job overrides don't leak into the shared config
+        preset = dict(config.presets[preset_name])
 
         # Get original filename without extension
         original_filename = os.path.basename(media_item.path)
@@ -329,26 +731,27 @@ def transcode(
         if not os.path.exists(media_item.path):
             raise FileNotFoundError(f"Input file not found: {media_item.path}")
 
+        # Bind the socket emitter once rather than looking it up on every
+        # progress update
+        emit_job_update = _get_emit_job_update()
+
+        last_emit = 0.0
+
         # Create a progress callback to update the job status
         def progress_callback(status_text, progress_value):
-            # Extract current time from status text if possible
-            time_match = re.search(r"Time: (\d+):(\d+):([\d.]+)", status_text)
+            # Extract current time and duration from status text in one pass
+            time_match = _STATUS_TIME_RE.search(status_text)
             if time_match:
-                h, m, s = time_match.groups()
-                current_time = int(h) * 3600 + int(m) * 60 + float(s)
-                job.current_time = current_time
-
-            # Extract duration from status if available
-            duration_match = re.search(r"(\d+):(\d+):([\d.]+)", status_text)
-            if duration_match and "/" in status_text:
-                parts = status_text.split("/", 1)
-                if len(parts) == 2 and duration_match:
-                    h, m, s = re.search(r"(\d+):(\d+):([\d.]+)", parts[1]).groups()
-                    job.duration = int(h) * 3600 + int(m) * 60 + float(s)
+                h, m, s, dh, dm, ds = time_match.groups()
+                job.current_time = int(h) * 3600 + int(m) * 60 + float(s)
+                if dh is not None:
+                    job.duration = int(dh) * 3600 + int(dm) * 60 + float(ds)
 
             if progress_value is not None:
                 job.progress = progress_value
 
+            job_store.save_job(job)
+
             # Add to logs if it's not just a progress update or empty
             if status_text and not status_text.startswith("Time:"):
                 with job._lock:
@@ -359,35 +762,20 @@ def transcode(
                         status_text = f"PROGRESS: {status_text}"
 
                     # De-duplicate logs (avoid adding the same line multiple times)
-                    if not any(status_text in log for log in job.ffmpeg_logs[-20:]):
-                        if len(job.ffmpeg_logs) >= 1000:
-                            job.ffmpeg_logs.pop(
-                                0
-                            )  # Remove oldest log if we have too many
+                    # The log deque is bounded, so the oldest entry drops off on its own
+                    if status_text not in "\n".join(job.recent_logs(20)):
                         job.ffmpeg_logs.append(status_text)
 
-            # Emit socket update every 2 seconds
-            if job.current_time and int(job.current_time) % 2 == 0:
-                try:
-                    from squishy.socket_events import emit_job_update
-
-                    # Include ffmpeg_logs in the job update
-                    with job._lock:
-                        emit_job_update(
-                            {
-                                "id": job.id,
-                                "media_id": job.media_id,
-                                "status": job.status,
-                                "progress": job.progress,
-                                "current_time": job.current_time,
-                                "duration": job.duration,
-                                "ffmpeg_logs": job.ffmpeg_logs[-30:]
-                                if job.ffmpeg_logs
-                                else [],  # Send last 30 log lines for efficiency
-                            }
-                        )
-                except ImportError:
-                    pass  # Ignore if socket_events can't be imported
+            # Emit socket update at most every PROGRESS_EMIT_INTERVAL seconds
+            nonlocal last_emit
+            now = time.monotonic()
+            if emit_job_update and now - last_emit >= PROGRESS_EMIT_INTERVAL:
+                last_emit = now
+                # Snapshot the job under its lock, but emit outside it; send
+                # only the last 30 log lines for efficiency
+                emit_job_update(
+                    job.emit_payload("current_time", "duration", log_count=30)
+                )
 
         # Get hardware acceleration settings from config
         hw_accel = config.hw_accel
@@ -396,206 +784,118 @@ def transcode(
         if hw_accel and hw_accel.lower() == "none":
             preset["force_software"] = True
 
+        # Use saved capabilities if configured, otherwise the cached detection
+        capabilities = config.hw_capabilities or get_capabilities(config.ffmpeg_path)
+
         # Run the effeffmpeg transcoding
         logger.info(f"Starting transcode for job {job.id} using effeffmpeg")
 
         try:
-            # Generate the command first with dry_run to log it
-            command = effeff_transcode(
-                input_file=media_item.path,
-                output_file=output_path,
-                dry_run=True,
-                overwrite=True,
-                presets_data={
-                    "preset": preset
-                },  # Wrap the preset in a dict as expected by effeffmpeg
-            )
-
-            # Add the command to the logs right away
-            cmd_str = " ".join(command)
-            with job._lock:
-                job.ffmpeg_logs.append(f"COMMAND: {cmd_str}")
-
-            # Store the command in the job
-            cmd_str = " ".join(command)
-            job.ffmpeg_command = cmd_str
-            logger.debug(f"FFmpeg command: {cmd_str}")
-
-            # Now run the actual transcode non-blocking to use our progress callback
-            process = effeff_transcode(
-                input_file=media_item.path,
-                output_file=output_path,
-                overwrite=True,
-                non_blocking=True,
-                progress_callback=progress_callback,
-                preset_name="preset",  # Use the preset name
-                presets_data={"preset": preset},  # Pass the preset data directly
-                quiet=False,  # Ensure we get verbose output for better logs
-            )
-
-            # Store the process ID for potential cancellation
-            if hasattr(process, "process") and process.process:
-                job.process_id = process.process.pid
-                logger.debug(f"Process ID for job {job.id}: {job.process_id}")
+            # Share the encoder CPUs between the jobs that may run at once
+            encoder_cpus = get_encoder_cpus(config.reserved_cpus)
+            threads = get_encoder_threads(encoder_cpus, config.max_concurrent_jobs)
+
+            # Use the runtime reported by the media server if there is one;
+            # otherwise probe it once here rather than on every attempt
+            duration = media_item.duration
+            if not duration:
+                duration = get_media_duration(media_item.path, config.ffprobe_path)
+                # Remember it on the scanned item so later jobs skip the probe
+                media_item.duration = duration
+            if duration:
+                with job._lock:
+                    job.duration = duration
+
+            # Probe the input's video format so known hardware failures can be
+            # skipped; only needed if hardware encoding may be tried at all
+            input_format = None
+            if capabilities.get("encoders") and len(_strategies_for(preset)) > 1:
+                input_format = get_video_format(media_item.path, config.ffprobe_path)
+            strategies = _strategies_for(preset, input_format)
+            if strategies[0] is not TRANSCODE_STRATEGIES[0]:
+                notice = (
+                    f"Skipping hardware encoding, it previously failed for "
+                    f"{'/'.join(input_format)} input"
+                )
+                logger.info(f"Job {job.id}: {notice}")
+                with job._lock:
+                    job.ffmpeg_logs.append(f"PROGRESS: {notice}")
+            for attempt, strategy in enumerate(strategies):
+                attempt_preset = {**preset, **strategy.preset_overrides}
+                if attempt and strategy.notice:
+                    logger.warning(f"Job {job.id}: {strategy.notice}")
+                    with job._lock:
+                        job.ffmpeg_logs.append(f"PROGRESS: {strategy.notice}")
+                        job.progress = 0.0
+
+                # Generate the command once with dry_run so it can be logged
+                # before it runs; passing the callback makes effeffmpeg add
+                # the progress flags the real run needs
+                command = effeff_transcode(
+                    input_file=media_item.path,
+                    output_file=output_path,
+                    dry_run=True,
+                    overwrite=True,
+                    capabilities=capabilities,
+                    progress_callback=progress_callback,
+                    preset_name="preset",
+                    presets_data={
+                        "preset": attempt_preset
+                    },  # Wrap the preset in a dict as expected by effeffmpeg
+                    threads=threads,
+                )
 
-            # Monitor the process
-            cancelled = False
-            while not process.finished:
-                # Check if job has been cancelled
+                # Join the command once for the logs and the job record
+                cmd_str = " ".join(command)
                 with job._lock:
-                    is_cancelled = job.status == "cancelled"
+                    job.ffmpeg_logs.append(f"COMMAND: {cmd_str}")
+                    job.ffmpeg_command = cmd_str
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"FFmpeg command: {cmd_str}")
+
+                # Run that same command non-blocking to use our progress callback
+                process = TranscodeProcess(
+                    command,
+                    progress_callback,
+                    nice=config.encoder_nice,
+                    cpu_affinity=encoder_cpus,
+                    duration=duration,
+                )
+                process.start()
 
-                if is_cancelled:
-                    logger.info(f"Job {job.id} has been cancelled, terminating process")
-                    process.terminate()
-                    cancelled = True
-                    break
+                returncode = _monitor_process(job, process, output_path)
 
-                # Update output file size
-                if os.path.exists(output_path):
-                    output_size = os.path.getsize(output_path)
-                    job.update_output_size(format_file_size(output_size))
-
-                # Read stdout and stderr buffers from the process and add to logs
-                if process.stdout_buffer or process.stderr_buffer:
-                    new_logs = []
-
-                    # Get stdout lines first (usually less important)
-                    for line in process.stdout_buffer:
-                        if line.strip() and not any(
-                            line in existing for existing in job.ffmpeg_logs[-100:]
-                        ):
-                            new_logs.append(f"STDOUT: {line}")
-
-                    # Get stderr lines (usually more important for ffmpeg)
-                    for line in process.stderr_buffer:
-                        if line.strip() and not any(
-                            line in existing for existing in job.ffmpeg_logs[-100:]
-                        ):
-                            new_logs.append(f"STDERR: {line}")
-
-                    # Add new logs to job logs
-                    if new_logs:
-                        with job._lock:
-                            # Keep the size manageable
-                            if len(job.ffmpeg_logs) + len(new_logs) > 1000:
-                                # Remove oldest logs to make room
-                                job.ffmpeg_logs = job.ffmpeg_logs[
-                                    -(1000 - len(new_logs)) :
-                                ]
-                            job.ffmpeg_logs.extend(new_logs)
-
-                # Use process.poll() instead of wait with timeout to check if it's still running
-                # This avoids the TimeoutExpired exception when using eventlet's patched subprocess
-                if process.process.poll() is not None:
-                    # Process completed
-                    process.finished = True
-                    process.returncode = process.process.returncode
-
-                    # Collect any final output
-                    stderr = process.get_stderr()
-
-                    # Add any remaining stderr output to logs
-                    if stderr:
-                        new_logs = []
-                        for line in stderr.splitlines():
-                            if line.strip() and not any(
-                                line in existing for existing in job.ffmpeg_logs[-100:]
-                            ):
-                                new_logs.append(f"STDERR: {line}")
-                        if new_logs:
-                            with job._lock:
-                                job.ffmpeg_logs.extend(new_logs)
+                # If cancelled, return early
+                if returncode is None:
+                    return
 
+                if returncode == 0:
+                    if attempt and input_format is not None:
+                        # Remember that hardware fails for this kind of input
+                        _HW_FAILURES.add(_hw_failure_key(preset, input_format))
                     break
 
-                # Sleep for a short time
-                time.sleep(0.5)
-
-            # If cancelled, return early
-            if cancelled:
-                return
-
-            # Check if the process completed successfully
-            if process.returncode != 0:
-                stderr = process.get_stderr()
-                logger.error(
-                    f"Transcode failed with code {process.returncode}: {stderr}"
-                )
-                raise RuntimeError(f"Transcode failed with code {process.returncode}")
-
-            # Update job status
-            job.update_status("completed")
+                # The full output is in the job logs; the error explanation
+                # is at the end, so only log the last few lines here
+                stderr = "\n".join(process.stderr_buffer[-FAILURE_LOG_LINES:])
+                logger.error(f"Transcode failed with code {returncode}: {stderr}")
 
-            # Update progress and output path
-            with job._lock:
-                job.progress = 1.0
-                job.output_path = output_path
+                # Only fall back if this attempt actually used hardware;
+                # otherwise the next strategy would run the same command again
+                if attempt + 1 == len(strategies) or "-hwaccel" not in command:
+                    raise RuntimeError(f"Transcode failed with code {returncode}")
 
-            # Get final output file size
-            if os.path.exists(output_path):
-                output_size = os.path.getsize(output_path)
-                job.update_output_size(format_file_size(output_size))
+            _complete_job(job, output_path)
 
             logger.debug(
                 f"Job {job.id} completed successfully, output: {output_path}, size: {job.output_size}"
             )
 
-            # Create JSON sidecar file with metadata
-            sidecar_path = f"{output_path}.json"
-
-            # Handle poster_url and thumbnail_url differently for Movies vs Episodes
-            poster_url = None
-            thumbnail_url = None
-
-            if isinstance(media_item, Episode):
-                # For episodes, we want to use the parent show's poster as the poster_url
-                # and the episode's thumbnail as the thumbnail_url
-                from squishy.scanner import get_show
-
-                show = get_show(media_item.show_id)
-                if show:
-                    poster_url = show.poster_url
-                # Use the episode's thumbnail_url if available, otherwise fall back to poster_url
-                thumbnail_url = media_item.thumbnail_url or media_item.poster_url
-            else:
-                # For movies, use the movie's poster_url as poster
-                poster_url = media_item.poster_url
-                # Use movie's thumbnail_url if available, otherwise fall back to poster_url
-                thumbnail_url = media_item.thumbnail_url or media_item.poster_url
-
-            metadata = {
-                "original_path": media_item.path,
-                "media_id": media_item.id,
-                "title": media_item.title,
-                "year": media_item.year,
-                "type": media_item.type,
-                "poster_url": poster_url,
-                "thumbnail_url": thumbnail_url,
-                "preset_name": preset_name,
-                "completed_at": datetime.datetime.now().isoformat(),
-                "output_size": job.output_size,
-                "duration": job.duration,
-            }
-
-            # Add TV show specific metadata if applicable
-            if isinstance(media_item, Episode):
-                metadata["show_id"] = media_item.show_id
-                metadata["season_number"] = media_item.season_number
-                metadata["episode_number"] = media_item.episode_number
-
-                # Add show title to the metadata
-                from squishy.scanner import get_show
-
-                show = get_show(media_item.show_id)
-                if show:
-                    metadata["show_title"] = show.title
-
-            # Write metadata to sidecar file
-            with open(sidecar_path, "w") as f:
-                json.dump(metadata, f, indent=2)
-
-            logger.debug(f"Created metadata sidecar file: {sidecar_path}")
+            # Write the metadata sidecar in the background so the job's slot
+            # is released right away
+            _SIDECAR_EXECUTOR.submit(
+                _write_sidecar, job, media_item, preset_name, output_path
+            )
 
         except Exception as e:
             logger.error(f"Error during transcoding: {str(e)}", exc_info=True)
@@ -605,7 +905,7 @@ def transcode(
         logger.error(f"Transcoding job {job.id} failed: {str(e)}", exc_info=True)
 
         # Update job status with thread safety
-        job.update_status("failed")
+        _set_status(job, "failed")
 
         # Update error message with thread safety
         with job._lock:
@@ -613,27 +913,63 @@ def transcode(
 
         # Make sure to capture final error messages in logs
         if hasattr(e, "stderr") and e.stderr:
-            error_lines = []
-
-            # Get current logs
+            # Only the last MAX_LOG_LINES lines can be kept, so skip the rest
+            error_lines = e.stderr.splitlines()[-MAX_LOG_LINES:]
             with job._lock:
-                error_lines = list(job.ffmpeg_logs)
+                job.ffmpeg_logs.extend(
+                    f"STDERR: {line.strip()}" for line in error_lines if line.strip()
+                )
 
-            # Add error lines
-            for line in e.stderr.splitlines():
-                if line.strip():
-                    error_lines.append(f"STDERR: {line.strip()}")
+        job_store.save_job(job)
 
-            # Update logs
-            job.update_logs(error_lines)
 
+def get_encoder_cpus(reserved_cpus: int) -> Optional[Set[int]]:
+    """Get the CPUs FFmpeg may use, leaving the first reserved_cpus for Squishy.
 
-def get_media_duration(input_path: str) -> Optional[float]:
-    """Get the duration of a media file in seconds using effeffmpeg."""
-    try:
-        # Run ffprobe to get duration
-        ffprobe_cmd = [
-            "ffprobe",
+    Returns None (no restriction) if nothing is reserved, CPU affinity isn't
+    supported, or reserving would leave FFmpeg without a CPU.
+    """
+    if reserved_cpus <= 0 or not hasattr(os, "sched_getaffinity"):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    if reserved_cpus >= len(cpus):
+        logger.warning(
+            f"reserved_cpus={reserved_cpus} leaves no CPUs for FFmpeg, ignoring"
+        )
+        return None
+    return set(cpus[reserved_cpus:])
+
+
+def get_encoder_threads(
+    encoder_cpus: Optional[Set[int]], max_concurrent_jobs: int
+) -> Optional[int]:
+    """Get how many threads each FFmpeg encoder may use.
+
+    When several jobs run at once, each would otherwise start a thread per
+    CPU and they would contend with each other, so the available CPUs are
+    split evenly between them. Returns None (FFmpeg's default) when only one
+    job runs at a time.
+    """
+    if max_concurrent_jobs <= 1:
+        return None
+    cpu_count = len(encoder_cpus) if encoder_cpus else os.cpu_count() or 1
+    return max(1, cpu_count // max_concurrent_jobs)
+
+
+@lru_cache(maxsize=1024)
+def _probe_duration(
+    input_path: str, ffprobe_path: str, mtime_ns: int, size: int
+) -> float:
+    """Run ffprobe for a file's duration.
+
+    Cached on the file's mtime and size so unchanged files are only probed
+    once. Failures raise, so they are not cached.
+    """
+    # ffprobe only opens the container, so this is much cheaper than
+    # running ffmpeg -i and parsing its banner
+    result = subprocess.run(
+        [
+            ffprobe_path,
             "-v",
             "error",
             "-show_entries",
@@ -641,37 +977,92 @@ def get_media_duration(input_path: str) -> Optional[float]:
             "-of",
             "default=noprint_wrappers=1:nokey=1",
             input_path,
-        ]
+        ],
+        capture_output=True,
+        text=True,
+        timeout=FFPROBE_TIMEOUT,
+    )
 
-        result = subprocess.run(ffprobe_cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr.strip()}")
 
-        if result.returncode == 0 and result.stdout.strip():
-            try:
-                # ffprobe returns duration in seconds as a float
-                return float(result.stdout.strip())
-            except (ValueError, TypeError) as e:
-                logger.error(f"Error parsing ffprobe duration: {e}")
-
-        # Fall back to regex parsing if ffprobe doesn't return a clean duration
-        ffmpeg_cmd = ["ffmpeg", "-i", input_path]
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-
-        # Look for duration in the output
-        duration_match = re.search(
-            r"Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})", result.stderr
+    # ffprobe returns duration in seconds as a float
+    return float(result.stdout.strip())
+
+
+@lru_cache(maxsize=1024)
+def _probe_video_format(
+    input_path: str, ffprobe_path: str, mtime_ns: int, size: int
+) -> Tuple[str, ...]:
+    """Run ffprobe for the codec, profile and pixel format of a file's first video stream.
+
+    Cached on the file's mtime and size. Failures raise, so they are not cached.
+    """
+    result = subprocess.run(
+        [
+            ffprobe_path,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=codec_name,profile,pix_fmt",
+            "-of",
+            "json",
+            input_path,
+        ],
+        capture_output=True,
+        text=True,
+        timeout=FFPROBE_TIMEOUT,
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr.strip()}")
+
+    streams = json.loads(result.stdout).get("streams") or [{}]
+    stream = streams[0]
+    return tuple(
+        str(stream.get(key, "unknown")) for key in ("codec_name", "profile", "pix_fmt")
+    )
+
+
+def get_video_format(
+    input_path: str, ffprobe_path: Optional[str] = None
+) -> Optional[Tuple[str, ...]]:
+    """Get (codec, profile, pixel format) of a file's first video stream using ffprobe."""
+    if ffprobe_path is None:
+        ffprobe_path = load_config().ffprobe_path
+
+    try:
+        stat = os.stat(input_path)
+        return _probe_video_format(
+            input_path, ffprobe_path, stat.st_mtime_ns, stat.st_size
         )
-        if duration_match:
-            hours = int(duration_match.group(1))
-            minutes = int(duration_match.group(2))
-            seconds = int(duration_match.group(3))
-            centiseconds = int(duration_match.group(4))
+    except Exception as e:
+        logger.error(f"Error getting video format for {input_path}: {str(e)}")
+        return None
+
+
+def get_media_duration(
+    input_path: str, ffprobe_path: Optional[str] = None
+) -> Optional[float]:
+    """Get the duration of a media file in seconds using ffprobe.
 
-            total_seconds = hours * 3600 + minutes * 60 + seconds + centiseconds / 100
-            return total_seconds
+    Args:
+        input_path: Path to the media file
+        ffprobe_path: Path to the ffprobe executable, defaults to the configured one
+    """
+    if ffprobe_path is None:
+        ffprobe_path = load_config().ffprobe_path
 
+    try:
+        stat = os.stat(input_path)
+        return _probe_duration(input_path, ffprobe_path, stat.st_mtime_ns, stat.st_size)
+    except (ValueError, TypeError) as e:
+        logger.error(f"Error parsing ffprobe duration: {e}")
         return None
     except Exception as e:
-        logger.error(f"Error getting media duration: {str(e)}")
+        logger.error(f"Error getting media duration for {input_path}: {str(e)}")
         return None
 
 
@@ -685,8 +1076,9 @@ def apply_output_path_mapping(path: str) -> str:
     config = load_config()
 
     # Print detailed debug information
-    logger.debug(f"apply_output_path_mapping: Input path: {path}")
-    logger.debug(f"apply_output_path_mapping: Path mappings: {config.path_mappings}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"apply_output_path_mapping: Input path: {path}")
+        logger.debug(f"apply_output_path_mapping: Path mappings: {config.path_mappings}")
 
     if not config.path_mappings:
         logger.debug(
@@ -694,8 +1086,16 @@ def apply_output_path_mapping(path: str) -> str:
         )
         return path
 
+    # The mappings are part of the cache key, so editing them in the admin
+    # UI naturally misses the cache; only the existence checks are reused.
+    return _resolve_output_mapping(path, tuple(config.path_mappings.items()))
+
+
+@lru_cache(maxsize=16)
+def _resolve_output_mapping(path: str, mappings: Tuple[Tuple[str, str], ...]) -> str:
+    """Resolve an output path against the configured mappings."""
     # Check if the transcode path is directly in the path mappings
-    for source_path, target_path in config.path_mappings.items():
+    for source_path, target_path in mappings:
         if path == source_path:
             logger.info(f"Mapping output path: {path} -> {target_path}")
             return target_path
@@ -705,7 +1105,7 @@ def apply_output_path_mapping(path: str) -> str:
         logger.debug(
             f"apply_output_path_mapping: Path {path} does not exist, checking for accessible alternatives"
         )
-        for source_path, target_path in config.path_mappings.items():
+        for source_path, target_path in mappings:
             # Check if the target path exists and matches our transcode path pattern
             if os.path.exists(target_path) and (
                 target_path.endswith("/transcodes") or target_path == "/transcodes"
@@ -721,18 +1121,6 @@ def apply_output_path_mapping(path: str) -> str:
     return path
 
 
-def format_file_size(size_bytes: int) -> str:
-    """Format file size in a human-readable way."""
-    if size_bytes < 1024:
-        return f"{size_bytes} B"
-    elif size_bytes < 1024 * 1024:
-        return f"{round(size_bytes / 1024, 2)} KB"
-    elif size_bytes < 1024 * 1024 * 1024:
-        return f"{round(size_bytes / (1024 * 1024), 2)} MB"
-    else:
-        return f"{round(size_bytes / (1024 * 1024 * 1024), 2)} GB"
-
-
 def get_process_status(pid: int) -> Optional[str]:
     """Get the status of a process by PID.
 
@@ -749,13 +1137,45 @@ def get_process_status(pid: int) -> Optional[str]:
     """
     try:
         with open(f"/proc/{pid}/stat", "r") as f:
-            stats = f.read().split()
-            if len(stats) > 2:
-                # Third field is the process state
-                return stats[2]
-        return None
+            stat = f.read()
+        # The state is the single character after the command name, which is
+        # wrapped in parentheses and may itself contain spaces or parentheses
+        return stat[stat.rindex(")") + 2]
     except (FileNotFoundError, PermissionError, ProcessLookupError):
         return None
+    except (ValueError, IndexError):
+        # Truncated or malformed stat line
+        return None
+
+
+def get_capabilities(ffmpeg_path: str, refresh: bool = False) -> Dict[str, Any]:
+    """Get hardware capabilities for an FFmpeg binary, detecting them once.
+
+    Detection runs several test encodes, so the result is cached per binary
+    and re-detected only if the binary changes or refresh is True. Re-detecting
+    also forgets remembered hardware failures. Returns a copy that callers may
+    modify.
+    """
+    resolved_path = shutil.which(ffmpeg_path) or ffmpeg_path
+    try:
+        mtime_ns = os.stat(resolved_path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    key = (resolved_path, mtime_ns)
+
+    with _CAPABILITIES_LOCK:
+        capabilities = None if refresh else _CAPABILITIES_CACHE.get(key)
+        if capabilities is None:
+            # Use effeffmpeg's detect_capabilities with the provided ffmpeg_path
+            logger.info(
+                f"Detecting hardware capabilities using FFmpeg at: {ffmpeg_path}"
+            )
+            capabilities = detect_capabilities(ffmpeg_path=ffmpeg_path)
+            _CAPABILITIES_CACHE[key] = capabilities
+            # Hardware failures seen with the old capabilities may not apply
+            _HW_FAILURES.clear()
+
+    return copy.deepcopy(capabilities)
 
 
 def detect_hw_accel(ffmpeg_path: str) -> Dict[str, Any]:
@@ -767,9 +1187,7 @@ def detect_hw_accel(ffmpeg_path: str) -> Dict[str, Any]:
         capabilities = config.hw_capabilities
         logger.info("Using hardware capabilities from config")
     else:
-        # Use effeffmpeg's detect_capabilities with the provided ffmpeg_path
-        logger.info(f"Detecting hardware capabilities using FFmpeg at: {ffmpeg_path}")
-        capabilities = detect_capabilities(ffmpeg_path=ffmpeg_path)
+        capabilities = get_capabilities(ffmpeg_path)
 
     # Format the results to match the expected output format in the admin UI
     result = {
@@ -787,21 +1205,21 @@ def detect_hw_accel(ffmpeg_path: str) -> Dict[str, Any]:
         "recommended": {"method": "", "device": ""},
     }
 
-    # Add detected methods
+    # Add the detected method, then the methods of the detected encoders
+    # (e.g., "vaapi" from "hevc_vaapi"); dict keys de-duplicate in order
     hwaccel = capabilities.get("hwaccel")
-    if hwaccel:
-        result["methods"].append(hwaccel)
-
-    # Add detected encoders as methods
-    for _, encoder in capabilities.get("encoders", {}).items():
-        method = encoder.split("_")[1] if "_" in encoder else encoder
-        if method not in result["methods"]:
-            result["methods"].append(method)
+    methods = dict.fromkeys([hwaccel] if hwaccel else [])
+    for encoder in capabilities.get("encoders", {}).values():
+        methods[encoder.rpartition("_")[2]] = None
+    result["methods"] = list(methods)
 
-    # Add detected devices
+    # Add detected devices, listing every render node so other GPUs show up
     device = capabilities.get("device")
     if device and hwaccel == "vaapi":
-        result["devices"]["vaapi"].append({"path": device})
+        paths = list_render_devices()
+        if device not in paths:
+            paths.insert(0, device)
+        result["devices"]["vaapi"].extend({"path": path} for path in paths)
 
     # Set recommended method and device
     if hwaccel:
@@ -833,25 +1251,14 @@ def cancel_job(job_id: str) -> bool:
         is_pending = job.status == "pending"
 
     if is_pending:
-        # Check if job is in the queue with thread safety
-        job_found = False
-        job_index = -1
-
-        with JOB_QUEUE_LOCK:
-            for i, queued_job in enumerate(JOB_QUEUE):
-                if queued_job["job_id"] == job_id:
-                    # Mark index for removal
-                    job_index = i
-                    job_found = True
-                    break
-
-            # Remove from queue if found (still inside the lock)
-            if job_index >= 0:
-                JOB_QUEUE.pop(job_index)
+        # Remove the job from the queue with thread safety
+        with _STATE_LOCK:
+            job_found = JOB_QUEUE.pop(job_id, None) is not None
 
         # Update job status if found in queue
         if job_found:
-            job.update_status("cancelled")
+            _set_status(job, "cancelled")
+            job_store.save_job(job)
             logger.info(f"Removed job {job_id} from queue")
             return True
 
@@ -861,19 +1268,21 @@ def cancel_job(job_id: str) -> bool:
         return False
 
     logger.info(f"Cancelling job {job_id}")
-    job.update_status("cancelled")
+    _set_status(job, "cancelled")
+    job_store.save_job(job)
 
-    # If the job has a process ID, try to terminate it directly
-    process_id = None
-    with job._lock:
-        process_id = job.process_id
+    # If FFmpeg is running, terminate it directly; this also wakes the job's
+    # monitor loop, which then sees the cancelled status. Between attempts no
+    # process is attached, and the next attempt's monitor sees the status.
+    with _STATE_LOCK:
+        process = _ACTIVE_PROCESSES.get(job_id)
 
-    if process_id:
+    if process:
         try:
-            os.kill(process_id, signal.SIGTERM)
-            logger.info(f"Sent SIGTERM to process {process_id}")
+            if process.send_signal(signal.SIGTERM):
+                logger.info(f"Sent SIGTERM to process {process.process.pid}")
         except (ProcessLookupError, PermissionError) as e:
-            logger.warning(f"Could not terminate process {process_id}: {str(e)}")
+            logger.warning(f"Could not terminate process for job {job_id}: {str(e)}")
 
     return True
 
@@ -904,18 +1313,32 @@ def remove_job(job_id: str) -> bool:
         logger.warning(f"Attempted to remove job {job_id} with status {job_status}")
         return False
 
-    # Remove the job from the global jobs dictionary with thread safety
+    # Remove the job from memory, if it's still cached, and from the store
     try:
-        with JOBS_LOCK:
-            if job_id in JOBS:
-                del JOBS[job_id]
-                logger.info(f"Removed job {job_id} with status {job_status}")
-                return True
-            else:
-                logger.warning(
-                    f"Failed to remove job {job_id}: Job not found in dictionary"
-                )
-                return False
+        with _STATE_LOCK:
+            JOBS.pop(job_id, None)
+            _FINISHED_IDS.pop(job_id, None)
+        job_store.delete_job(job_id)
+        logger.info(f"Removed job {job_id} with status {job_status}")
+        return True
     except Exception as e:
         logger.warning(f"Failed to remove job {job_id}: {str(e)}")
         return False
+
+
+def init_transcoder():
+    """Restore persisted jobs and start the scheduler thread.
+
+    Called once at app startup rather than on import, so importing this
+    module doesn't open the job store or start threads. Safe to call more
+    than once.
+    """
+    global _SCHEDULER_THREAD
+    with _STATE_LOCK:
+        if _SCHEDULER_THREAD is not None:
+            return
+        _restore_jobs()
+        _SCHEDULER_THREAD = threading.Thread(
+            target=_scheduler_loop, name="transcode-scheduler", daemon=True
+        )
+        _SCHEDULER_THREAD.start()